@@ -8,121 +8,126 @@ Utilizado pelo hook de pre-commit para documentar alterações.
 
 import os
 import sys
+import functools
 import subprocess
 from datetime import datetime
 
 
-def run_command(command):
-    """Executa um comando e retorna a saída."""
-    process = subprocess.Popen(
-        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, text=True
-    )
-    stdout, stderr = process.communicate()
+# Cabeçalho da seção adicionada à mensagem de commit
+INFO_HEADER = "# Informações do Commit"
+
+# Tradução dos códigos de status do git
+STATUS_MAP = {
+    "A": "Adicionado",
+    "M": "Modificado",
+    "D": "Removido",
+    "R": "Renomeado",
+}
+
+
+def _git(*args, text=True):
+    """Executa um comando git diretamente (sem shell) e retorna a saída."""
+    process = subprocess.run(["git", *args], capture_output=True, text=text, check=False)
     if process.returncode != 0:
-        print(f"Erro ao executar comando: {command}")
+        stderr = process.stderr if text else process.stderr.decode(errors="replace")
+        print(f"Erro ao executar comando: git {' '.join(args)}")
         print(f"Erro: {stderr}")
         return None
-    return stdout.strip()
+    # Saída binária (-z) é devolvida intacta para preservar os separadores NUL
+    return process.stdout.strip() if text else process.stdout
+
+
+@functools.lru_cache(maxsize=1)
+def _git_dir():
+    """Retorna o diretório .git do repositório, consultando o git uma única vez."""
+    return _git("rev-parse", "--git-dir")
+
+
+def has_staged_changes():
+    """Indica se há alterações no índice, usando apenas o código de saída do git."""
+    # --quiet não gera saída: retorna 0 sem alterações e 1 quando há algo para commitar
+    return subprocess.run(["git", "diff", "--cached", "--quiet"], check=False).returncode != 0
 
 
 def get_staged_files():
     """Retorna a lista de arquivos que serão incluídos no commit."""
-    result = run_command("git diff --cached --name-status")
+    # Com -z, os campos vêm separados por NUL e os nomes de arquivo não são escapados
+    result = _git("diff", "--cached", "--name-status", "-z", text=False)
     if not result:
         return []
     
+    fields = result.split(b"\x00")
     files = []
-    for line in result.split("\n"):
-        if not line.strip():
-            continue
-        
-        parts = line.split("\t")
-        if len(parts) < 2:
-            continue
-            
-        status = parts[0]
-        filename = parts[1]
+    i = 0
+    while i + 1 < len(fields) and fields[i]:
+        status = fields[i].decode("ascii")
+        filename = fields[i + 1]
         
-        # Traduz o status
-        status_map = {
-            "A": "Adicionado",
-            "M": "Modificado",
-            "D": "Removido",
-            "R": "Renomeado",
-        }
+        # Renomeações e cópias trazem dois caminhos (origem e destino)
+        i += 3 if status[0] in "RC" else 2
         
-        status_text = status_map.get(status[0], status)
-        files.append((status_text, filename))
+        status_text = STATUS_MAP.get(status[0], status)
+        files.append((status_text, filename.decode("utf-8", errors="replace")))
     
     return files
 
 
-def get_commit_message():
-    """Obtém a mensagem de commit do arquivo COMMIT_EDITMSG."""
-    try:
-        git_dir = run_command("git rev-parse --git-dir")
-        if not git_dir:
-            return None
-            
-        commit_msg_file = os.path.join(git_dir, "COMMIT_EDITMSG")
-        if not os.path.exists(commit_msg_file):
-            return None
-            
-        with open(commit_msg_file, "r", encoding="utf-8") as f:
-            msg = f.read().strip()
-            # Remove comentários
-            msg = "\n".join([line for line in msg.split("\n") 
-                           if not line.startswith("#") and line.strip()])
-            return msg
-    except Exception as e:
-        print(f"Erro ao obter mensagem de commit: {e}")
-        return None
+def _strip_comments(msg):
+    """Remove linhas de comentário e linhas vazias de uma mensagem de commit."""
+    return "\n".join([line for line in msg.strip().split("\n")
+                      if not line.startswith("#") and line.strip()])
 
 
 def generate_commit_info():
     """Gera informações sobre o commit atual."""
+    if not has_staged_changes():
+        print("Nenhum arquivo para commit.")
+        return
+    
+    git_dir = _git_dir()
+    if not git_dir:
+        return
+    
     today = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     staged_files = get_staged_files()
-    commit_message = get_commit_message()
     
     if not staged_files:
         print("Nenhum arquivo para commit.")
         return
     
-    info = [
-        f"Data: {today}",
-        "Arquivos alterados:",
-    ]
-    
-    for status, filename in staged_files:
-        info.append(f"  - {status}: {filename}")
-    
-    if commit_message:
-        info.append("\nMensagem do commit:")
-        info.append(commit_message)
-    
-    info_text = "\n".join(info)
-    
-    # Adicionar à mensagem de commit
-    commit_msg_file = os.path.join(run_command("git rev-parse --git-dir"), "COMMIT_EDITMSG")
-    with open(commit_msg_file, "r", encoding="utf-8") as f:
+    # Ler e reescrever COMMIT_EDITMSG com uma única abertura do arquivo
+    commit_msg_file = os.path.join(git_dir, "COMMIT_EDITMSG")
+    with open(commit_msg_file, "r+", encoding="utf-8") as f:
         original_msg = f.read()
         
-    # Verificar se já existe nossa seção
-    if "# Informações do Commit" in original_msg:
-        return
+        # Verificar se já existe nossa seção
+        if INFO_HEADER in original_msg:
+            return
+        
+        commit_message = _strip_comments(original_msg)
+        
+        info_block = (
+            f"{INFO_HEADER}\nData: {today}\nArquivos alterados:\n"
+            + "".join(f"  - {status}: {filename}\n" for status, filename in staged_files)
+            + (f"\nMensagem do commit:\n{commit_message}\n" if commit_message else "")
+        )
+        
+        # Encontra a primeira linha de comentários e insere o bloco antes dela
+        if original_msg.startswith("#"):
+            head, tail = "", original_msg
+        else:
+            comment_pos = original_msg.find("\n#")
+            if comment_pos < 0:
+                head, tail = original_msg, ""
+            else:
+                head, tail = original_msg[:comment_pos], original_msg[comment_pos + 1:]
         
-    with open(commit_msg_file, "w", encoding="utf-8") as f:
-        # Encontra a linha de comentários e insere antes dela
-        lines = original_msg.split("\n")
-        comment_index = next((i for i, line in enumerate(lines) if line.startswith("#")), len(lines))
+        separator = "\n\n" if head.strip() else ""
+        new_content = head + separator + info_block + "\n" + tail
         
-        new_content = "\n".join(lines[:comment_index])
-        if new_content.strip():
-            new_content += "\n\n"
-            
-        new_content += "# Informações do Commit\n" + info_text + "\n\n" + "\n".join(lines[comment_index:])
+        f.seek(0)
         f.write(new_content)
+        f.truncate()
 
 
 if __name__ == "__main__":
@@ -8,25 +8,26 @@ Instala o pre-commit se necessário e executa os hooks automaticamente.
 
 import os
 import sys
+import shlex
 import subprocess
 import argparse
 
+# Hook instalado pelo pre-commit; sua existência indica que a configuração já foi feita
+PRE_COMMIT_HOOK = os.path.join(".git", "hooks", "pre-commit")
 
-def run_command(command, show_output=True):
-    """Executa um comando e retorna a saída."""
-    print(f"Executando: {command}")
-    process = subprocess.Popen(
-        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, text=True
-    )
-    stdout, stderr = process.communicate()
+
+def run_command(args, show_output=True):
+    """Executa um comando (lista de argumentos, sem shell) e retorna a saída."""
+    print(f"Executando: {shlex.join(args)}")
+    process = subprocess.run(args, capture_output=True, text=True, check=False)
     
     if show_output:
-        if stdout:
-            print(stdout)
-        if stderr and process.returncode != 0:
-            print(f"ERRO: {stderr}")
+        if process.stdout:
+            print(process.stdout)
+        if process.stderr and process.returncode != 0:
+            print(f"ERRO: {process.stderr}")
     
-    return process.returncode, stdout, stderr
+    return process.returncode, process.stdout, process.stderr
 
 
 def check_pre_commit_installed():
@@ -36,7 +37,7 @@ def check_pre_commit_installed():
         return True
     except ImportError:
         print("pre-commit não está instalado. Instalando...")
-        code, _, _ = run_command("pip install pre-commit")
+        code, _, _ = run_command([sys.executable, "-m", "pip", "install", "pre-commit"])
         if code != 0:
             print("Falha ao instalar pre-commit. Instale manualmente: pip install pre-commit")
             return False
@@ -47,12 +48,14 @@ def check_pre_commit_installed():
 def setup_pre_commit():
     """Configura o pre-commit para o repositório."""
     # Verifica se o pre-commit já está instalado no repositório
-    if os.path.exists(".git/hooks/pre-commit"):
+    if os.path.exists(PRE_COMMIT_HOOK):
         print("pre-commit já está configurado para este repositório.")
         return True
     
     print("Configurando pre-commit para o repositório...")
-    code, _, _ = run_command("pre-commit install --hook-type pre-commit --hook-type prepare-commit-msg")
+    code, _, _ = run_command(
+        [sys.executable, "-m", "pre_commit", "install", "--hook-type", "pre-commit", "--hook-type", "prepare-commit-msg"]
+    )
     
     if code != 0:
         print("Falha ao configurar pre-commit. Configure manualmente: pre-commit install")
@@ -65,13 +68,13 @@ def setup_pre_commit():
 def commit_changes(message):
     """Faz o commit das alterações com a mensagem fornecida."""
     # Adiciona todas as alterações ao staging
-    code, _, _ = run_command("git add .")
+    code, _, _ = run_command(["git", "add", "."])
     if code != 0:
         print("Falha ao adicionar arquivos ao staging.")
         return False
         
     # Faz o commit com a mensagem fornecida
-    code, _, _ = run_command(f'git commit -m "{message}"')
+    code, _, _ = run_command(["git", "commit", "-m", message])
     if code != 0:
         print("O commit falhou. Verifique os hooks do pre-commit.")
         return False
@@ -90,13 +93,15 @@ def main():
         print("Por favor, forneça uma mensagem de commit.")
         return 1
     
-    # Verifica se o pré-commit está instalado
-    if not check_pre_commit_installed():
-        return 1
-        
-    # Configura o pre-commit
-    if not setup_pre_commit():
-        return 1
+    # Com o hook já instalado, não é preciso verificar nem configurar o pre-commit
+    if not os.path.exists(PRE_COMMIT_HOOK):
+        # Verifica se o pré-commit está instalado
+        if not check_pre_commit_installed():
+            return 1
+            
+        # Configura o pre-commit
+        if not setup_pre_commit():
+            return 1
         
     # Faz o commit
     if not commit_changes(args.message):
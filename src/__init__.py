@@ -11,10 +11,33 @@ treinamento de modelos YOLOv8, avaliação e inferência.
 __version__ = "0.1.0"
 __author__ = "YOLOv8 Training Team"
 
+import importlib
+
 from src.utils.logger import setup_logging
 from src.utils.config_loader import load_yaml_config, validate_config
-from src.core.data_management import RoboflowDownloader
-from src.core.training import TrainingConfig, YOLOv8Trainer, TrainingPipeline, ITrainer, ITrainingPipeline
+
+# Componentes importados sob demanda (PEP 562), para que importar o pacote, por exemplo
+# em "python -m src.main --help", não carregue pydantic, roboflow e o trainer
+_LAZY_ATTRS = {
+    "RoboflowDownloader": "src.core.data_management",
+    "TrainingConfig": "src.core.training",
+    "YOLOv8Trainer": "src.core.training",
+    "TrainingPipeline": "src.core.training",
+    "ITrainer": "src.core.training",
+    "ITrainingPipeline": "src.core.training",
+}
+
+
+def __getattr__(name: str):
+    """Importa o componente solicitado na primeira vez em que é acessado."""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
 
 # Configuração automática de logging
 setup_logging()
@@ -10,13 +10,135 @@ imagens e anotações, e validação do arquivo YAML.
 """
 
 import os
+import sys
 import yaml
 import logging
+import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Tuple, Union, List, Set
+from typing import Dict, Any, FrozenSet, Optional, Tuple, Union, List, Set
 
 from src.core.data_management.interface import IDatasetValidator
 
+# Usar o loader em C (libyaml) quando disponível, bem mais rápido que o loader em Python puro
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Campos obrigatórios do arquivo data.yaml
+REQUIRED_YAML_FIELDS = frozenset({"path", "train", "val", "test", "names"})
+
+# Extensões de imagem aceitas (comparadas em minúsculas)
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".bmp", ".webp"})
+LABEL_EXTENSIONS = frozenset({".txt"})
+
+@functools.lru_cache(maxsize=32)
+def _load_yaml_file(path_str: str, mtime_ns: int, size: int) -> Any:
+    """
+    Lê e analisa um arquivo YAML, memorizando o resultado por caminho e versão do arquivo.
+    
+    A chave inclui mtime e tamanho, então uma alteração no arquivo gera uma nova entrada.
+    
+    Args:
+        path_str (str): Caminho absoluto do arquivo YAML.
+        mtime_ns (int): Data de modificação do arquivo, em nanossegundos.
+        size (int): Tamanho do arquivo em bytes.
+        
+    Returns:
+        Any: Conteúdo do arquivo YAML.
+    """
+    with open(path_str, "rb") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def read_yaml_cached(yaml_path: Path) -> Any:
+    """
+    Lê o arquivo YAML, reaproveitando a análise anterior enquanto o arquivo não mudar.
+    
+    O cache fica apenas em memória, sem gravar nada ao lado do YAML. O conteúdo devolvido
+    é compartilhado entre as chamadas e não deve ser modificado.
+    
+    Args:
+        yaml_path (Path): Caminho para o arquivo YAML.
+        
+    Returns:
+        Any: Conteúdo do arquivo YAML.
+    """
+    stat = os.stat(yaml_path)
+    return _load_yaml_file(os.path.abspath(yaml_path), stat.st_mtime_ns, stat.st_size)
+
+
+def count_images(directory: Union[str, Path]) -> int:
+    """
+    Conta as imagens de um diretório em uma única passada, sem montar listas intermediárias.
+    
+    Args:
+        directory (Union[str, Path]): Diretório de imagens.
+        
+    Returns:
+        int: Quantidade de imagens encontradas.
+        
+    Raises:
+        FileNotFoundError: Se o diretório não existir.
+    """
+    count = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS and entry.is_file():
+                count += 1
+    
+    return count
+
+
+def dataset_fingerprint(directory: Union[str, Path]) -> str:
+    """
+    Calcula uma impressão digital barata da estrutura de um dataset.
+    
+    Combina o mtime dos subdiretórios da raiz e dos subdiretórios deles (ex.: train/images,
+    images/train) com mtime e tamanho do data.yaml. Apenas diretórios e o data.yaml recebem
+    stat; os arquivos de imagem e de anotação não são listados, então o custo não depende
+    do tamanho do dataset e fica bem abaixo do de uma validação.
+    
+    Como o mtime de um diretório muda quando arquivos são adicionados, removidos ou
+    renomeados nele, a impressão digital muda junto. Limite: uma imagem ou anotação
+    reescrita no lugar (mesmo nome) não altera a impressão digital.
+    
+    Args:
+        directory (Union[str, Path]): Diretório raiz do dataset.
+        
+    Returns:
+        str: Impressão digital em hexadecimal.
+        
+    Raises:
+        FileNotFoundError: Se o diretório não existir.
+    """
+    root = os.fspath(directory)
+    digest = hashlib.blake2b(digest_size=16)
+    
+    try:
+        stat = os.stat(os.path.join(root, "data.yaml"))
+        digest.update(f"data.yaml\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+    except FileNotFoundError:
+        digest.update(b"data.yaml\0-\n")
+    
+    # is_dir() usa o tipo informado pelo scandir, sem stat para os arquivos da raiz
+    with os.scandir(root) as entries:
+        subdirs = sorted(entry.path for entry in entries if entry.is_dir())
+    
+    for subdir in subdirs:
+        with os.scandir(subdir) as entries:
+            nested = sorted(entry.path for entry in entries if entry.is_dir())
+        for path in [subdir] + nested:
+            name = os.path.relpath(path, root)
+            digest.update(f"{name}\0{os.stat(path).st_mtime_ns}\n".encode())
+    
+    return digest.hexdigest()
+
 
 class DatasetValidator(IDatasetValidator):
     """
@@ -24,15 +146,8 @@ class DatasetValidator(IDatasetValidator):
     
     Esta classe implementa métodos para validar a estrutura e integridade
     de datasets no formato YOLOv8.
-    
-    Attributes:
-        logger (logging.Logger): Logger para registrar eventos.
     """
     
-    def __init__(self):
-        """Inicializa o validador de datasets."""
-        self.logger = logging.getLogger(__name__)
-    
     def validate(self, dataset_path: Union[str, Path]) -> Tuple[bool, Dict[str, Any]]:
         """
         Valida a estrutura e os arquivos de um dataset.
@@ -48,20 +163,22 @@ class DatasetValidator(IDatasetValidator):
         
         # Verificar se o diretório existe
         if not dataset_path.exists() or not dataset_path.is_dir():
-            self.logger.error(f"Diretório do dataset não encontrado: {dataset_path}")
+            logger.error("Diretório do dataset não encontrado: %s", dataset_path)
             return False, {"error": f"Diretório do dataset não encontrado: {dataset_path}"}
         
-        # Verificar o arquivo YAML
-        if not self.check_yaml(yaml_path):
+        # Verificar o arquivo YAML (o conteúdo é reaproveitado nas estatísticas)
+        yaml_data = self._load_yaml(yaml_path)
+        if yaml_data is None:
             return False, {"error": f"Arquivo YAML inválido: {yaml_path}"}
         
         # Verificar a correspondência entre imagens e anotações
-        if not self.check_images_annotations(dataset_path):
+        valid, image_scans = self._check_images_annotations(dataset_path)
+        if not valid:
             return False, {"error": "Discrepância entre imagens e anotações"}
         
-        # Calcular estatísticas
-        stats = self._calculate_stats(dataset_path, yaml_path)
-        self.logger.info(f"Dataset validado: {stats}")
+        # Calcular estatísticas reaproveitando as varreduras de imagens já feitas
+        stats = self._calculate_stats(dataset_path, yaml_data, image_scans)
+        logger.info("Dataset validado: %s", stats)
         
         return True, stats
     
@@ -75,36 +192,44 @@ class DatasetValidator(IDatasetValidator):
         Returns:
             bool: True se o arquivo YAML for válido, False caso contrário.
         """
-        yaml_path = Path(yaml_path)
+        return self._load_yaml(Path(yaml_path)) is not None
+    
+    def _load_yaml(self, yaml_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Carrega e valida o arquivo YAML do dataset.
         
+        Args:
+            yaml_path (Path): Caminho para o arquivo YAML do dataset.
+            
+        Returns:
+            Optional[Dict[str, Any]]: Conteúdo do YAML se for válido, None caso contrário.
+        """
         # Verificar se o arquivo existe
         if not yaml_path.exists():
-            self.logger.error(f"Arquivo YAML não encontrado: {yaml_path}")
-            return False
+            logger.error("Arquivo YAML não encontrado: %s", yaml_path)
+            return None
         
         try:
             # Carregar o arquivo YAML
-            with open(yaml_path, "r") as f:
-                data = yaml.safe_load(f)
+            data = read_yaml_cached(yaml_path)
             
             # Verificar campos obrigatórios
-            required_fields = ["path", "train", "val", "test", "names"]
-            for field in required_fields:
-                if field not in data:
-                    self.logger.error(f"Campo obrigatório '{field}' ausente no YAML")
-                    return False
+            missing_fields = REQUIRED_YAML_FIELDS.difference(data)
+            if missing_fields:
+                logger.error("Campos obrigatórios ausentes no YAML: %s", ", ".join(sorted(missing_fields)))
+                return None
             
             # Verificar se há pelo menos uma classe
             if not data["names"] or not isinstance(data["names"], dict):
-                self.logger.error("Nenhuma classe definida no arquivo YAML")
-                return False
+                logger.error("Nenhuma classe definida no arquivo YAML")
+                return None
             
-            self.logger.info(f"Arquivo YAML válido: {len(data['names'])} classes definidas")
-            return True
+            logger.info("Arquivo YAML válido: %d classes definidas", len(data["names"]))
+            return data
             
         except Exception as e:
-            self.logger.error(f"Erro ao validar arquivo YAML: {str(e)}")
-            return False
+            logger.error("Erro ao validar arquivo YAML: %s", e)
+            return None
     
     def check_images_annotations(self, dataset_path: Union[str, Path]) -> bool:
         """
@@ -116,46 +241,166 @@ class DatasetValidator(IDatasetValidator):
         Returns:
             bool: True se houver correspondência entre imagens e anotações, False caso contrário.
         """
-        dataset_path = Path(dataset_path)
+        valid, _ = self._check_images_annotations(Path(dataset_path))
+        return valid
+    
+    def _check_images_annotations(self, dataset_path: Path) -> Tuple[bool, Dict[str, Dict[str, Any]]]:
+        """
+        Verifica a correspondência entre imagens e anotações, retornando as varreduras de imagens.
+        
+        As varreduras são reaproveitadas por _calculate_stats, evitando percorrer
+        os mesmos diretórios de imagens novamente.
         
-        # Verificar cada conjunto (train, val, test)
-        for subset in ["train", "val", "test"]:
-            images_dir = dataset_path / "images" / subset
-            labels_dir = dataset_path / "labels" / subset
+        Args:
+            dataset_path (Path): Caminho para o diretório do dataset.
             
-            # Verificar se os diretórios existem
-            if not images_dir.exists() or not labels_dir.exists():
-                self.logger.warning(f"Diretórios para {subset} não encontrados")
-                continue
+        Returns:
+            Tuple[bool, Dict[str, Dict[str, Any]]]: Tupla (válido, varreduras) com o resultado
+                da verificação e a varredura de imagens de cada conjunto verificado.
+        """
+        subsets = ["train", "val", "test"]
+        check_subset = functools.partial(self._check_subset, os.fspath(dataset_path))
+        
+        # Os conjuntos são independentes e limitados por I/O: verificá-los em paralelo
+        # sobrepõe as leituras de diretório (o GIL é liberado durante as syscalls)
+        if (os.cpu_count() or 1) > 1:
+            with ThreadPoolExecutor(max_workers=len(subsets)) as executor:
+                results = list(executor.map(check_subset, subsets))
+        else:
+            results = [check_subset(subset) for subset in subsets]
+        
+        image_scans = {subset: scan for subset, (_, scan) in zip(subsets, results) if scan is not None}
+        if not all(valid for valid, _ in results):
+            return False, image_scans
+        
+        logger.info("Correspondência entre imagens e anotações verificada")
+        return True, image_scans
+    
+    def _check_subset(self, dataset_path: str, subset: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Verifica a correspondência entre imagens e anotações de um único conjunto.
+        
+        Args:
+            dataset_path (str): Caminho para o diretório do dataset.
+            subset (str): Nome do conjunto (train, val ou test).
+            
+        Returns:
+            Tuple[bool, Optional[Dict[str, Any]]]: Tupla (válido, varredura) com o resultado da
+                verificação e a varredura das imagens, ou None se os diretórios não existirem.
+        """
+        # Caminhos montados como str: o scandir os recebe diretamente, sem objetos Path
+        images_dir = os.path.join(dataset_path, "images", subset)
+        labels_dir = os.path.join(dataset_path, "labels", subset)
+        
+        # Varrer cada diretório uma única vez; a ausência dos diretórios é detectada
+        # pelo próprio scandir, sem um stat prévio para cada um
+        try:
+            image_scan = self._scan_dir(images_dir, IMAGE_EXTENSIONS)
+            label_scan = self._scan_dir(labels_dir, LABEL_EXTENSIONS)
+        except (FileNotFoundError, NotADirectoryError):
+            logger.warning("Diretórios para %s não encontrados", subset)
+            return True, None
+        
+        # Caso comum: mesmas quantidades e mesmo resumo dos nomes, sem montar conjuntos
+        if image_scan == label_scan:
+            return True, image_scan
+        
+        # Divergência (ou nomes repetidos com extensões diferentes): comparar os conjuntos
+        # de nomes para decidir e produzir a mensagem com o que está faltando
+        try:
+            image_files = self._collect_stems(images_dir, IMAGE_EXTENSIONS)
+            label_files = self._collect_stems(labels_dir, LABEL_EXTENSIONS)
+        except (FileNotFoundError, NotADirectoryError):
+            logger.warning("Diretórios para %s não encontrados", subset)
+            return True, None
+        
+        if image_files != label_files:
+            missing_labels = image_files - label_files
+            missing_images = label_files - image_files
             
-            # Obter listas de arquivos
-            image_files = set(f.stem for f in images_dir.glob("*.jpg") if f.is_file())
-            image_files.update(f.stem for f in images_dir.glob("*.png") if f.is_file())
-            label_files = set(f.stem for f in labels_dir.glob("*.txt") if f.is_file())
-            
-            # Verificar correspondência
-            if image_files != label_files:
-                missing_labels = image_files - label_files
-                missing_images = label_files - image_files
-                
-                if missing_labels:
-                    self.logger.error(f"Imagens sem anotações em {subset}: {len(missing_labels)}")
-                
-                if missing_images:
-                    self.logger.error(f"Anotações sem imagens em {subset}: {len(missing_images)}")
-                
-                return False
-        
-        self.logger.info("Correspondência entre imagens e anotações verificada")
-        return True
-    
-    def _calculate_stats(self, dataset_path: Path, yaml_path: Path) -> Dict[str, Any]:
+            if missing_labels:
+                logger.error("Imagens sem anotações em %s: %d", subset, len(missing_labels))
+            
+            if missing_images:
+                logger.error("Anotações sem imagens em %s: %d", subset, len(missing_images))
+            
+            return False, image_scan
+        
+        return True, image_scan
+    
+    @staticmethod
+    def _scan_dir(directory: str, extensions: FrozenSet[str]) -> Dict[str, Any]:
+        """
+        Percorre um diretório uma única vez, resumindo os arquivos com as extensões informadas.
+        
+        O resumo combina os hashes dos nomes sem extensão com XOR e soma, operações que
+        independem da ordem de listagem, então dois diretórios com os mesmos nomes têm o
+        mesmo resumo sem que nenhum conjunto seja mantido em memória. O tipo de cada
+        entrada vem da própria leitura do diretório (d_type no Linux, dados do
+        FindFirstFile no Windows), então não há um stat por arquivo.
+        
+        Args:
+            directory (str): Diretório a ser percorrido.
+            extensions (FrozenSet[str]): Extensões aceitas, em minúsculas (ex.: IMAGE_EXTENSIONS).
+            
+        Returns:
+            Dict[str, Any]: Quantidade de arquivos ("count") e resumo dos nomes ("digest").
+            
+        Raises:
+            FileNotFoundError: Se o diretório não existir.
+        """
+        count = 0
+        digest_xor = 0
+        digest_sum = 0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() in extensions and entry.is_file():
+                    stem_hash = hash(stem)
+                    digest_xor ^= stem_hash
+                    digest_sum += stem_hash
+                    count += 1
+        
+        return {"count": count, "digest": (digest_xor, digest_sum)}
+    
+    @staticmethod
+    def _collect_stems(directory: str, extensions: FrozenSet[str]) -> FrozenSet[str]:
+        """
+        Coleta os nomes sem extensão dos arquivos com as extensões informadas.
+        
+        Args:
+            directory (str): Diretório a ser percorrido.
+            extensions (FrozenSet[str]): Extensões aceitas, em minúsculas (ex.: IMAGE_EXTENSIONS).
+            
+        Returns:
+            FrozenSet[str]: Nomes dos arquivos sem extensão.
+            
+        Raises:
+            FileNotFoundError: Se o diretório não existir.
+        """
+        # Os nomes são internados para que imagens e labels de mesmo nome compartilhem
+        # a mesma string, reduzindo a memória e acelerando a comparação entre conjuntos
+        stems = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() in extensions and entry.is_file():
+                    stems.append(sys.intern(stem))
+        
+        return frozenset(stems)
+    
+    def _calculate_stats(self,
+                         dataset_path: Path,
+                         yaml_data: Dict[str, Any],
+                         image_scans: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Calcula estatísticas do dataset.
         
         Args:
             dataset_path (Path): Caminho para o diretório do dataset.
-            yaml_path (Path): Caminho para o arquivo YAML do dataset.
+            yaml_data (Dict[str, Any]): Conteúdo já validado do arquivo YAML do dataset.
+            image_scans (Optional[Dict[str, Dict[str, Any]]]): Varreduras de imagens já feitas
+                por conjunto; conjuntos ausentes são contados diretamente no disco.
             
         Returns:
             Dict[str, Any]: Estatísticas do dataset.
@@ -168,27 +413,23 @@ class DatasetValidator(IDatasetValidator):
             "path": str(dataset_path)
         }
         
-        # Contar imagens em cada conjunto
-        train_dir = dataset_path / "images" / "train"
-        val_dir = dataset_path / "images" / "val"
-        test_dir = dataset_path / "images" / "test"
-        
-        if train_dir.exists():
-            stats["train_images"] = len(list(train_dir.glob("*.jpg"))) + len(list(train_dir.glob("*.png")))
-        
-        if val_dir.exists():
-            stats["valid_images"] = len(list(val_dir.glob("*.jpg"))) + len(list(val_dir.glob("*.png")))
+        image_scans = image_scans or {}
+        images_base = os.path.join(dataset_path, "images")
         
-        if test_dir.exists():
-            stats["test_images"] = len(list(test_dir.glob("*.jpg"))) + len(list(test_dir.glob("*.png")))
+        # Contar imagens em cada conjunto
+        for subset, key in (("train", "train_images"), ("val", "valid_images"), ("test", "test_images")):
+            if subset in image_scans:
+                stats[key] = image_scans[subset]["count"]
+                continue
+            
+            try:
+                stats[key] = count_images(os.path.join(images_base, subset))
+            except (FileNotFoundError, NotADirectoryError):
+                pass
         
-        # Carregar número de classes do YAML
-        try:
-            with open(yaml_path, "r") as f:
-                data = yaml.safe_load(f)
-                stats["classes"] = len(data.get("names", {}))
-                stats["class_names"] = list(data.get("names", {}).values())
-        except Exception:
-            pass
+        # Número de classes a partir do YAML já carregado
+        names = yaml_data.get("names", {})
+        stats["classes"] = len(names)
+        stats["class_names"] = list(names.values())
         
         return stats 
\ No newline at end of file
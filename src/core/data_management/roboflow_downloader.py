@@ -20,6 +20,7 @@ try:
 except ImportError:
     ROBOFLOW_AVAILABLE = False
 
+from src.core.data_management.dataset_validator import count_images, read_yaml_cached
 from src.utils.config_loader import load_yaml_config, validate_config
 
 
@@ -96,14 +97,9 @@ class RoboflowDownloader:
                 self.logger.error(f"Falha ao criar diretório {self.dest_dir}: {str(e)}")
                 raise PermissionError(f"Não foi possível criar o diretório de destino: {self.dest_dir}")
         
-        # Verificar permissões de escrita
-        test_file = self.dest_dir / ".write_test"
-        try:
-            with open(test_file, "w") as f:
-                f.write("test")
-            test_file.unlink()  # Remover arquivo de teste
-        except Exception as e:
-            self.logger.error(f"Sem permissão de escrita em {self.dest_dir}: {str(e)}")
+        # Verificar permissões de escrita (e de acesso ao conteúdo) sem criar arquivos de teste
+        if not os.access(self.dest_dir, os.W_OK | os.X_OK):
+            self.logger.error(f"Sem permissão de escrita em {self.dest_dir}")
             raise PermissionError(f"Sem permissão de escrita no diretório: {self.dest_dir}")
     
     def download_dataset(self, force_download: bool = False) -> Tuple[bool, str]:
@@ -190,9 +186,11 @@ class RoboflowDownloader:
                 stats["error"] = f"Diretório obrigatório não encontrado: {dir_name}"
                 return False, stats
             
-            # Contar imagens nos diretórios train/valid/test
-            images_count = len(list(dir_path.glob("images/*.jpg"))) + len(list(dir_path.glob("images/*.png")))
-            stats[f"{dir_name}_images"] = images_count
+            # Contar imagens nos diretórios train/valid/test em uma única varredura
+            try:
+                stats[f"{dir_name}_images"] = count_images(dir_path / "images")
+            except (FileNotFoundError, NotADirectoryError):
+                pass
         
         for file_name in required_files:
             file_path = data_dir / file_name
@@ -201,13 +199,11 @@ class RoboflowDownloader:
                 stats["error"] = f"Arquivo obrigatório não encontrado: {file_name}"
                 return False, stats
         
-        # Ler classes do arquivo data.yaml
+        # Ler classes do arquivo data.yaml, compartilhando o cache do DatasetValidator
         try:
-            from yaml import safe_load
-            with open(data_dir / "data.yaml", "r") as f:
-                data_yaml = safe_load(f)
-                if "names" in data_yaml:
-                    stats["classes"] = data_yaml["names"]
+            data_yaml = read_yaml_cached(data_dir / "data.yaml")
+            if "names" in data_yaml:
+                stats["classes"] = data_yaml["names"]
         except Exception as e:
             self.logger.warning(f"Não foi possível ler as classes do arquivo data.yaml: {str(e)}")
         
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Módulo para pré-carregamento de lotes na GPU durante o treinamento.
+
+Este módulo implementa um wrapper de DataLoader que copia o próximo lote
+para a GPU em um stream CUDA separado, sobrepondo a cópia host→device
+ao processamento do lote atual, e um trainer do ultralytics que o utiliza.
+"""
+
+import functools
+from typing import Any, Iterator, Optional, Tuple
+
+
+class CUDAPrefetcher:
+    """
+    Envolve um DataLoader e antecipa a cópia de cada lote para a GPU.
+    
+    Enquanto o lote atual é processado no stream padrão, o próximo é copiado
+    com non_blocking=True em um stream dedicado; antes de entregá-lo, o stream
+    padrão aguarda a cópia. Os demais atributos (dataset, sampler, reset, etc.)
+    são delegados ao DataLoader original.
+    
+    Attributes:
+        loader (Any): DataLoader original (idealmente com pin_memory=True).
+        device (Any): Dispositivo CUDA de destino.
+        keys (Optional[Tuple[str, ...]]): Chaves dos lotes em dicionário a copiar;
+            None copia todos os tensores do lote.
+    """
+    
+    def __init__(self, loader: Any, device: Any, keys: Optional[Tuple[str, ...]] = None):
+        """
+        Inicializa o prefetcher.
+        
+        Args:
+            loader (Any): DataLoader a ser envolvido.
+            device (Any): Dispositivo CUDA de destino.
+            keys (Optional[Tuple[str, ...]]): Chaves dos lotes em dicionário a copiar.
+        """
+        import torch
+        
+        self.loader = loader
+        self.device = device
+        self.keys = keys
+        self.stream = torch.cuda.Stream(device=device)
+    
+    def __len__(self) -> int:
+        return len(self.loader)
+    
+    def __getattr__(self, name: str) -> Any:
+        # Chamado apenas para atributos ausentes: delega ao DataLoader original
+        if name == "loader":
+            raise AttributeError(name)
+        return getattr(self.loader, name)
+    
+    def __iter__(self) -> Iterator[Any]:
+        import torch
+        
+        iterator = iter(self.loader)
+        batch = self._preload(iterator)
+        while batch is not None:
+            # Garantir que a cópia terminou e que a memória não seja reutilizada antes da hora
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_stream(self.stream)
+            self._record_stream(batch, current_stream)
+            
+            # Disparar a cópia do próximo lote antes de entregar o atual
+            next_batch = self._preload(iterator)
+            yield batch
+            batch = next_batch
+    
+    def _preload(self, iterator: Iterator[Any]) -> Optional[Any]:
+        """
+        Obtém o próximo lote e inicia sua cópia para a GPU no stream dedicado.
+        
+        Args:
+            iterator (Iterator[Any]): Iterador do DataLoader.
+        
+        Returns:
+            Optional[Any]: Lote com os tensores já enfileirados para a GPU, ou None no fim.
+        """
+        import torch
+        
+        try:
+            batch = next(iterator)
+        except StopIteration:
+            return None
+        
+        with torch.cuda.stream(self.stream):
+            if isinstance(batch, dict):
+                return {
+                    key: self._to_device(value) if self.keys is None or key in self.keys else value
+                    for key, value in batch.items()
+                }
+            return self._to_device(batch)
+    
+    def _to_device(self, value: Any) -> Any:
+        """Copia recursivamente os tensores de um lote para o dispositivo."""
+        if hasattr(value, "to") and hasattr(value, "record_stream"):
+            return value.to(self.device, non_blocking=True)
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._to_device(item) for item in value)
+        return value
+    
+    def _record_stream(self, value: Any, stream: Any) -> None:
+        """Associa os tensores do lote ao stream que vai consumi-los."""
+        if hasattr(value, "record_stream") and getattr(value, "is_cuda", False):
+            value.record_stream(stream)
+        elif isinstance(value, dict):
+            for item in value.values():
+                self._record_stream(item, stream)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                self._record_stream(item, stream)
+
+
+@functools.lru_cache(maxsize=1)
+def build_prefetch_trainer() -> type:
+    """
+    Cria (uma única vez) um DetectionTrainer que pré-carrega os lotes de treino na GPU.
+    
+    A classe é criada sob demanda para que o ultralytics só seja importado quando usado.
+    Apenas as imagens ("img") são copiadas antecipadamente: são o único tensor grande do
+    lote, e o ultralytics já move os demais para o dispositivo ao calcular a perda.
+    
+    Returns:
+        type: Subclasse de DetectionTrainer a ser passada em YOLO.train(trainer=...).
+    """
+    from ultralytics.models.yolo.detect import DetectionTrainer
+    
+    class PrefetchDetectionTrainer(DetectionTrainer):
+        """DetectionTrainer cujo DataLoader de treino usa CUDAPrefetcher."""
+        
+        def get_dataloader(self, dataset_path, batch_size=16, rank=0, mode="train"):
+            loader = super().get_dataloader(dataset_path, batch_size, rank, mode)
+            if mode == "train" and self.device.type == "cuda":
+                return CUDAPrefetcher(loader, self.device, keys=("img",))
+            return loader
+    
+    return PrefetchDetectionTrainer
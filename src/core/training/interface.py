@@ -4,24 +4,26 @@
 """
 Interfaces para o módulo de treinamento.
 
-Este módulo define as interfaces abstratas para treinamento
+Este módulo define as interfaces (protocolos estruturais) para treinamento
 e avaliação de modelos.
 """
 
-from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Dict, Any, Optional, Protocol, Tuple, Union
 from pathlib import Path
 
 
-class ITrainer(ABC):
+class ITrainer(Protocol):
     """
     Interface para treinadores de modelos.
     
-    Define os métodos abstratos que devem ser implementados por
-    qualquer classe concreta que treine modelos.
+    Define os métodos que devem ser implementados por qualquer classe
+    que treine modelos, por herança explícita ou apenas estruturalmente.
+    
+    Opcionalmente, um treinador pode oferecer warm_up() -> None para preparar recursos
+    (ex.: carregar o modelo) enquanto os dados ainda estão sendo baixados; o pipeline
+    chama esse método apenas quando ele existe.
     """
     
-    @abstractmethod
     def train(self, data_yaml_path: Optional[Union[str, Path]] = None, resume: bool = False) -> Dict[str, Any]:
         """
         Treina um modelo com os parâmetros configurados.
@@ -33,9 +35,8 @@ class ITrainer(ABC):
         Returns:
             Dict[str, Any]: Métricas e resultados do treinamento.
         """
-        pass
+        ...
     
-    @abstractmethod
     def validate(self) -> Dict[str, Any]:
         """
         Valida o modelo treinado no conjunto de validação.
@@ -43,9 +44,8 @@ class ITrainer(ABC):
         Returns:
             Dict[str, Any]: Métricas de validação.
         """
-        pass
+        ...
     
-    @abstractmethod
     def export_model(self, format: str = "onnx", output_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
         """
         Exporta o modelo treinado para outros formatos.
@@ -57,18 +57,20 @@ class ITrainer(ABC):
         Returns:
             Dict[str, Any]: Informações sobre o modelo exportado.
         """
-        pass
+        ...
 
 
-class ITrainingPipeline(ABC):
+class ITrainingPipeline(Protocol):
     """
     Interface para pipelines de treinamento.
     
-    Define métodos abstratos para executar um fluxo completo de treinamento,
+    Define os métodos para executar um fluxo completo de treinamento,
     desde o download dos dados até a avaliação do modelo.
     """
     
-    @abstractmethod
+    # Sem atributos próprios, para que implementações possam usar __slots__
+    __slots__ = ()
+    
     def download_data(self, force: bool = False) -> bool:
         """
         Realiza o download dos dados necessários para o treinamento.
@@ -79,9 +81,8 @@ class ITrainingPipeline(ABC):
         Returns:
             bool: True se o download foi bem-sucedido, False caso contrário.
         """
-        pass
+        ...
     
-    @abstractmethod
     def prepare_data(self) -> bool:
         """
         Prepara os dados para treinamento, realizando pré-processamentos necessários.
@@ -89,9 +90,8 @@ class ITrainingPipeline(ABC):
         Returns:
             bool: True se a preparação foi bem-sucedida, False caso contrário.
         """
-        pass
+        ...
     
-    @abstractmethod
     def train_model(self) -> Dict[str, Any]:
         """
         Treina o modelo com os dados preparados.
@@ -99,9 +99,8 @@ class ITrainingPipeline(ABC):
         Returns:
             Dict[str, Any]: Métricas e resultados do treinamento.
         """
-        pass
+        ...
     
-    @abstractmethod
     def evaluate_model(self) -> Dict[str, Any]:
         """
         Avalia o modelo treinado.
@@ -109,9 +108,8 @@ class ITrainingPipeline(ABC):
         Returns:
             Dict[str, Any]: Métricas de avaliação.
         """
-        pass
+        ...
     
-    @abstractmethod
     def deploy_model(self, format: str = "onnx") -> Dict[str, Any]:
         """
         Exporta o modelo para implantação.
@@ -9,14 +9,47 @@ e hiperparâmetros para treinamento de modelos YOLOv8 usando pydantic.
 """
 
 import os
+import sys
 import logging
 import yaml
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Any, Optional, List, Union, Tuple, Literal
 from pydantic import BaseModel, Field, validator, root_validator, PositiveInt, PositiveFloat
 
 from src.utils.config_loader import load_yaml_config
 
+# Tamanhos de modelo aceitos, por extenso ou abreviados (comparados em minúsculas)
+_VALID_MODEL_SIZES = frozenset(("nano", "small", "medium", "large", "xlarge", "n", "s", "m", "l", "x"))
+
+# Máscara para verificar se o tamanho da imagem é múltiplo de 32
+_IMG_SIZE_ALIGN_MASK = 31
+
+# Códigos abreviados dos tamanhos de modelo do YOLOv8 (nomes abreviados são mantidos)
+_MODEL_SIZE_CODES = MappingProxyType({
+    "nano": "n", "small": "s", "medium": "m", "large": "l", "xlarge": "x",
+})
+
+# Valores já validados por arquivo de configuração, indexados pelo caminho e pelo conteúdo
+# carregado (já com as variáveis de ambiente substituídas)
+_VALIDATED_CONFIG_CACHE: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+
+# Quantidade máxima de arquivos mantidos em _VALIDATED_CONFIG_CACHE (o mesmo de load_yaml_config)
+_VALIDATED_CONFIG_CACHE_SIZE = 32
+
+
+def _ensure_directory(path: str) -> None:
+    """
+    Cria o diretório (e os diretórios pai) caso ainda não exista.
+    
+    Um caminho já existente, mesmo que seja um arquivo, é aceito sem alterações.
+    
+    Args:
+        path (str): Caminho do diretório.
+    """
+    if not os.path.exists(path):
+        os.makedirs(path, exist_ok=True)
+
 
 class YOLOv8Hyperparameters(BaseModel):
     """
@@ -52,19 +85,46 @@ class YOLOv8Hyperparameters(BaseModel):
     )
     device: str = Field(
         default="",
-        description="Dispositivo para treinamento (vazio para autodetecção, ou '0' para primeira GPU)"
+        description="Dispositivo para treinamento (vazio para autodetecção, '0' para a primeira GPU, '0,1' para DDP, ou 'auto' para todas as GPUs)"
+    )
+    workers: PositiveInt = Field(
+        default_factory=lambda: min(8, os.cpu_count() or 1),
+        description="Número de workers do DataLoader (padrão: até 8, limitado pelos núcleos disponíveis)"
+    )
+    amp: bool = Field(
+        default=True,
+        description="Usar precisão mista automática (AMP) no treinamento"
+    )
+    channels_last: bool = Field(
+        default=True,
+        description="Converter o modelo para o formato de memória channels_last ao treinar em GPU"
+    )
+    cache: Optional[Union[bool, Literal["ram", "disk"]]] = Field(
+        default=None,
+        description="Cache de imagens do ultralytics (ram, disk ou False); None escolhe automaticamente"
+    )
+    cuda_prefetch: bool = Field(
+        default=False,
+        description="Copiar o próximo lote para a GPU em um stream CUDA separado durante o treino"
+    )
+    compile: bool = Field(
+        default=False,
+        description="Compilar o modelo com torch.compile (TorchInductor) ao treinar em GPU"
+    )
+    cudnn_benchmark: bool = Field(
+        default=False,
+        description="Ativar o autotuner do cuDNN ao treinar em GPU (desativa o modo determinístico do ultralytics)"
     )
     
     @validator('model_size')
     def validate_model_size(cls, v):
-        valid_sizes = ["nano", "small", "medium", "large", "xlarge", "n", "s", "m", "l", "x"]
-        if v.lower() not in valid_sizes:
-            raise ValueError(f"Tamanho de modelo inválido: {v}. Valores válidos: {valid_sizes}")
+        if v.lower() not in _VALID_MODEL_SIZES:
+            raise ValueError(f"Tamanho de modelo inválido: {v}. Valores válidos: {sorted(_VALID_MODEL_SIZES)}")
         return v
     
     @validator('img_size')
     def validate_img_size(cls, v):
-        if v % 32 != 0:
+        if v & _IMG_SIZE_ALIGN_MASK:
             raise ValueError(f"Tamanho de imagem deve ser múltiplo de 32: {v}")
         return v
 
@@ -86,17 +146,19 @@ class TrainingPaths(BaseModel):
         description="Caminho para o arquivo data.yaml do dataset"
     )
     
-    @validator('model_save_dir', 'data_dir')
-    def create_if_not_exists(cls, v):
-        if not v.exists():
-            v.mkdir(parents=True, exist_ok=True)
-        return v
-    
-    @validator('data_yaml_path')
-    def validate_data_yaml(cls, v):
-        if v is not None and not v.exists():
-            raise ValueError(f"Arquivo data.yaml não encontrado: {v}")
-        return v
+    @root_validator(skip_on_failure=True)
+    def validate_paths(cls, values):
+        # Um único validador para todos os caminhos: cria os diretórios ausentes e
+        # verifica o data.yaml, na mesma ordem dos campos
+        for field in ('data_dir', 'model_save_dir'):
+            directory = values.get(field)
+            if directory is not None:
+                _ensure_directory(os.fspath(directory))
+        
+        data_yaml_path = values.get('data_yaml_path')
+        if data_yaml_path is not None and not data_yaml_path.exists():
+            raise ValueError(f"Arquivo data.yaml não encontrado: {data_yaml_path}")
+        return values
 
 
 class TrainingConfig(BaseModel):
@@ -112,12 +174,19 @@ class TrainingConfig(BaseModel):
         arbitrary_types_allowed = True
     
     @classmethod
-    def from_yaml(cls, config_path: str = "config/settings.yml") -> "TrainingConfig":
+    def from_yaml(cls, config_path: str = "config/settings.yml", validate: bool = False) -> "TrainingConfig":
         """
         Carrega configuração de um arquivo YAML.
         
+        O arquivo é lido por load_yaml_config (que memoriza a análise e substitui as
+        variáveis de ambiente a cada chamada) e validado na primeira vez em que um conteúdo
+        aparece. Enquanto o conteúdo carregado for o mesmo, as chamadas seguintes reaproveitam
+        os valores já validados e montam os modelos com model_construct, sem executar a
+        validação do pydantic novamente; apenas os diretórios são garantidos outra vez.
+        
         Args:
             config_path (str): Caminho para o arquivo de configuração YAML.
+            validate (bool): Se True, ignora o cache e valida o arquivo novamente.
             
         Returns:
             TrainingConfig: Instância de TrainingConfig com os valores do YAML.
@@ -126,17 +195,54 @@ class TrainingConfig(BaseModel):
             FileNotFoundError: Se o arquivo não for encontrado.
             ValueError: Se o arquivo contiver configurações inválidas.
         """
-        # Verificar se o arquivo existe
-        if not Path(config_path).exists():
-            raise FileNotFoundError(f"Arquivo de configuração não encontrado: {config_path}")
-        
-        # Carregar configurações do YAML
+        # Carregar o YAML com as variáveis de ambiente atuais; o conteúdo resultante compõe a
+        # chave do cache, então uma variável alterada leva a uma nova validação
         config_data = load_yaml_config(config_path)
+        cache_key = (os.path.abspath(config_path), repr(config_data))
+        if validate:
+            _VALIDATED_CONFIG_CACHE.pop(cache_key, None)
+        
+        data = _VALIDATED_CONFIG_CACHE.pop(cache_key, None)
+        if data is None:
+            config = cls._validate_yaml(config_data)
+            data = config.model_dump()
+        else:
+            config = cls.model_construct_trusted(data)
+            
+            # model_construct não executa o validador de TrainingPaths: recriar diretórios
+            # removidos desde a validação anterior
+            for directory in (config.paths.data_dir, config.paths.model_save_dir):
+                _ensure_directory(os.fspath(directory))
+        
+        # Reinserir a entrada como a mais recente e descartar a mais antiga se exceder o limite
+        # (versões anteriores de um arquivo alterado deixam de ser usadas e saem primeiro)
+        _VALIDATED_CONFIG_CACHE[cache_key] = data
+        if len(_VALIDATED_CONFIG_CACHE) > _VALIDATED_CONFIG_CACHE_SIZE:
+            del _VALIDATED_CONFIG_CACHE[next(iter(_VALIDATED_CONFIG_CACHE))]
         
+        return config
+    
+    @classmethod
+    def _validate_yaml(cls, config_data: Dict[str, Any]) -> "TrainingConfig":
+        """
+        Valida integralmente a configuração carregada de um arquivo YAML.
+        
+        Args:
+            config_data (Dict[str, Any]): Conteúdo do YAML, já com as variáveis de ambiente substituídas.
+            
+        Returns:
+            TrainingConfig: Instância validada de TrainingConfig.
+            
+        Raises:
+            ValueError: Se o arquivo contiver configurações inválidas.
+        """
         # Extrair seções relevantes
         training_config = config_data.get("training", {})
         paths_config = config_data.get("paths", {})
         
+        # Workers do DataLoader: seção training ou, na ausência, environment.num_workers
+        workers = training_config.get("workers", config_data.get("environment", {}).get("num_workers"))
+        
         # Construir objetos do modelo
         hyperparams = YOLOv8Hyperparameters(
             model_size=training_config.get("model_size", "nano"),
@@ -146,7 +252,8 @@ class TrainingConfig(BaseModel):
             optimizer=training_config.get("optimizer", "SGD"),
             lr0=training_config.get("lr0", 0.01),
             patience=training_config.get("patience", 50),
-            device=training_config.get("device", "")
+            device=training_config.get("device", ""),
+            **({"workers": workers} if workers is not None else {})
         )
         
         paths = TrainingPaths(
@@ -160,6 +267,25 @@ class TrainingConfig(BaseModel):
             paths=paths
         )
     
+    @classmethod
+    def model_construct_trusted(cls, data: Dict[str, Dict[str, Any]]) -> "TrainingConfig":
+        """
+        Monta a configuração a partir de valores já validados, sem executar validadores.
+        
+        Destinado a dados de origem confiável, como o resultado de model_dump() de uma
+        configuração validada anteriormente. Para dados externos, use o construtor normal.
+        
+        Args:
+            data (Dict[str, Dict[str, Any]]): Seções "hyperparameters" e "paths" já validadas.
+            
+        Returns:
+            TrainingConfig: Instância de TrainingConfig com os valores fornecidos.
+        """
+        return cls.model_construct(
+            hyperparameters=YOLOv8Hyperparameters.model_construct(**data["hyperparameters"]),
+            paths=TrainingPaths.model_construct(**data["paths"])
+        )
+    
     def get_yolo_model_name(self) -> str:
         """
         Retorna o nome formatado do modelo YOLOv8 baseado no tamanho.
@@ -167,15 +293,9 @@ class TrainingConfig(BaseModel):
         Returns:
             str: Nome do modelo no formato "yolov8n.pt", "yolov8s.pt", etc.
         """
-        # Converte model_size para o formato abreviado correto
-        size_mapping = {
-            "nano": "n", "small": "s", "medium": "m", "large": "l", "xlarge": "x",
-        }
-        
         # Se já for abreviado (n, s, m, l, x), mantém; caso contrário, converte
         size_code = self.hyperparameters.model_size.lower()
-        if size_code in size_mapping.keys():
-            size_code = size_mapping[size_code]
+        size_code = _MODEL_SIZE_CODES.get(size_code, size_code)
         
         return f"yolov8{size_code}.pt"
     
@@ -183,24 +303,37 @@ class TrainingConfig(BaseModel):
         """
         Retorna os argumentos formatados para treinar o modelo com a API do YOLOv8.
         
+        Os argumentos são montados a cada chamada, refletindo alterações feitas em
+        hyperparameters e paths (inclusive em seus campos), e o chamador pode alterá-los.
+        
         Returns:
             Dict[str, Any]: Dicionário com argumentos de treinamento prontos para ultralytics.
         """
-        return {
+        hp = self.hyperparameters
+        training_args = {
             "data": str(self.paths.data_yaml_path) if self.paths.data_yaml_path else None,
-            "epochs": self.hyperparameters.epochs,
-            "patience": self.hyperparameters.patience,
-            "batch": self.hyperparameters.batch_size,
-            "imgsz": self.hyperparameters.img_size,
-            "optimizer": self.hyperparameters.optimizer,
-            "lr0": self.hyperparameters.lr0,
-            "device": self.hyperparameters.device,
+            "epochs": hp.epochs,
+            "patience": hp.patience,
+            "batch": hp.batch_size,
+            "imgsz": hp.img_size,
+            "optimizer": hp.optimizer,
+            "lr0": hp.lr0,
+            "device": hp.device,
+            "workers": hp.workers,
+            "amp": hp.amp,
             "project": str(self.paths.model_save_dir),
-            "name": f"yolov8_{self.hyperparameters.model_size}_{self.hyperparameters.img_size}px",
+            # Nome da execução, reutilizado como nome de diretório e nos logs
+            "name": sys.intern(f"yolov8_{hp.model_size}_{hp.img_size}px"),
             "exist_ok": True,
             "pretrained": True,
             "verbose": True
         }
+        
+        # Sem valor definido, o modo de cache é escolhido pelo trainer conforme a memória
+        if hp.cache is not None:
+            training_args["cache"] = hp.cache
+        
+        return training_args
     
     def set_data_yaml_path(self, data_yaml_path: Union[str, Path]) -> None:
         """
@@ -11,12 +11,16 @@ desde o download dos dados até a exportação do modelo.
 import os
 import logging
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Union, Tuple
 
 from src.core.data_management.interface import IDataDownloader
 from src.core.training.interface import ITrainer, ITrainingPipeline
 from src.core.training.training_config_pydantic import TrainingConfig
 
+# Configurar logger
+logger = logging.getLogger(__name__)
+
 
 class TrainingPipeline(ITrainingPipeline):
     """
@@ -29,9 +33,10 @@ class TrainingPipeline(ITrainingPipeline):
         config (TrainingConfig): Configuração para o treinamento.
         downloader (IDataDownloader): Downloader de datasets.
         trainer (ITrainer): Treinador de modelos.
-        logger (logging.Logger): Logger para registrar eventos.
     """
     
+    __slots__ = ("config", "downloader", "trainer")
+    
     def __init__(self, 
                 config: TrainingConfig, 
                 downloader: IDataDownloader, 
@@ -44,12 +49,11 @@ class TrainingPipeline(ITrainingPipeline):
             downloader (IDataDownloader): Downloader para obter os dados.
             trainer (ITrainer): Treinador para treinar o modelo.
         """
-        self.logger = logging.getLogger(__name__)
         self.config = config
         self.downloader = downloader
         self.trainer = trainer
         
-        self.logger.info("Pipeline de treinamento inicializado")
+        logger.info("Pipeline de treinamento inicializado")
     
     def download_data(self, force: bool = False) -> bool:
         """
@@ -61,21 +65,21 @@ class TrainingPipeline(ITrainingPipeline):
         Returns:
             bool: True se o download foi bem-sucedido, False caso contrário.
         """
-        self.logger.info("Iniciando download de dados")
+        logger.info("Iniciando download de dados")
         
         try:
             # Realizar download
             success, message = self.downloader.download_dataset(force_download=force)
             
             if not success:
-                self.logger.error(f"Falha no download: {message}")
+                logger.error("Falha no download: %s", message)
                 return False
             
-            self.logger.info(f"Download concluído: {message}")
+            logger.info("Download concluído: %s", message)
             return True
             
         except Exception as e:
-            self.logger.error(f"Erro no download de dados: {str(e)}")
+            logger.error("Erro no download de dados: %s", e)
             return False
     
     def prepare_data(self) -> bool:
@@ -85,34 +89,95 @@ class TrainingPipeline(ITrainingPipeline):
         Returns:
             bool: True se a preparação foi bem-sucedida, False caso contrário.
         """
-        self.logger.info("Preparando dados para treinamento")
+        valid, data_yaml_path = self._validate_dataset()
+        if not valid:
+            return False
+        
+        return self._configure_data_yaml(data_yaml_path)
+    
+    def _validate_dataset(self) -> Tuple[bool, Optional[Path]]:
+        """
+        Valida o dataset baixado e localiza o data.yaml, sem alterar a configuração.
+        
+        Returns:
+            Tuple[bool, Optional[Path]]: Tupla (válido, data.yaml); o caminho é None quando
+                as estatísticas do dataset não informam o diretório. O arquivo em si só é
+                verificado ao ser configurado.
+        """
+        logger.info("Preparando dados para treinamento")
         
         try:
             # Validar dataset
             valid, stats = self.downloader.validate_dataset()
             
             if not valid:
-                self.logger.error(f"Dataset inválido: {stats.get('error', 'Erro desconhecido')}")
-                return False
+                logger.error("Dataset inválido: %s", stats.get("error", "Erro desconhecido"))
+                return False, None
             
-            self.logger.info(f"Dataset válido com {stats.get('train_images')} imagens de treino")
+            logger.info("Dataset válido com %s imagens de treino", stats.get("train_images"))
             
-            # Configurar data_yaml_path para o trainer
-            if stats.get("path"):
-                data_yaml_path = Path(stats["path"]) / "data.yaml"
-                if data_yaml_path.exists():
-                    self.config.set_data_yaml_path(data_yaml_path)
-                    self.logger.info(f"data.yaml configurado: {data_yaml_path}")
-                else:
-                    self.logger.error(f"data.yaml não encontrado em {data_yaml_path}")
-                    return False
+            # Localizar o data.yaml; a existência é verificada por set_data_yaml_path
+            path = stats.get("path")
+            return True, Path(path, "data.yaml") if path else None
             
-            return True
+        except Exception as e:
+            logger.error("Erro na preparação de dados: %s", e)
+            return False, None
+    
+    def _configure_data_yaml(self, data_yaml_path: Optional[Path]) -> bool:
+        """
+        Configura o data.yaml do dataset validado para o trainer.
+        
+        Args:
+            data_yaml_path (Optional[Path]): Caminho do data.yaml, ou None para manter o atual.
             
+        Returns:
+            bool: True se a configuração foi bem-sucedida, False caso contrário.
+        """
+        if data_yaml_path is None:
+            return True
+        
+        try:
+            self.config.set_data_yaml_path(data_yaml_path)
+            logger.info("data.yaml configurado: %s", data_yaml_path)
+            return True
+        except FileNotFoundError:
+            logger.error("data.yaml não encontrado em %s", data_yaml_path)
+            return False
         except Exception as e:
-            self.logger.error(f"Erro na preparação de dados: {str(e)}")
+            logger.error("Erro na preparação de dados: %s", e)
             return False
     
+    def _download_then_prepare(self, force: bool) -> Tuple[bool, bool, Optional[Path]]:
+        """
+        Realiza o download e, se bem-sucedido, valida o dataset baixado.
+        
+        Args:
+            force (bool): Se True, força o download mesmo se os dados já existirem.
+            
+        Returns:
+            Tuple[bool, bool, Optional[Path]]: Tupla (download, válido, data.yaml).
+        """
+        if not self.download_data(force=force):
+            return False, False, None
+        
+        valid, data_yaml_path = self._validate_dataset()
+        return True, valid, data_yaml_path
+    
+    def _warm_up_trainer(self) -> None:
+        """
+        Aquece o treinador, se ele oferecer warm_up(); falhas são apenas registradas e
+        tratadas novamente no treino.
+        """
+        warm_up = getattr(self.trainer, "warm_up", None)
+        if warm_up is None:
+            return
+        
+        try:
+            warm_up()
+        except Exception as e:
+            logger.warning("Falha ao aquecer o treinador: %s", e)
+    
     def train_model(self) -> Dict[str, Any]:
         """
         Treina o modelo com os dados preparados.
@@ -120,16 +185,16 @@ class TrainingPipeline(ITrainingPipeline):
         Returns:
             Dict[str, Any]: Métricas e resultados do treinamento.
         """
-        self.logger.info("Iniciando treinamento do modelo")
+        logger.info("Iniciando treinamento do modelo")
         
         try:
             # Treinar modelo
             metrics = self.trainer.train()
-            self.logger.info(f"Treinamento concluído: {metrics}")
+            logger.info("Treinamento concluído: %s", metrics)
             return metrics
             
         except Exception as e:
-            self.logger.error(f"Erro no treinamento: {str(e)}")
+            logger.error("Erro no treinamento: %s", e)
             return {"success": False, "error": str(e)}
     
     def evaluate_model(self) -> Dict[str, Any]:
@@ -139,16 +204,16 @@ class TrainingPipeline(ITrainingPipeline):
         Returns:
             Dict[str, Any]: Métricas de avaliação.
         """
-        self.logger.info("Avaliando modelo treinado")
+        logger.info("Avaliando modelo treinado")
         
         try:
             # Validar modelo
             metrics = self.trainer.validate()
-            self.logger.info(f"Avaliação concluída: {metrics}")
+            logger.info("Avaliação concluída: %s", metrics)
             return metrics
             
         except Exception as e:
-            self.logger.error(f"Erro na avaliação: {str(e)}")
+            logger.error("Erro na avaliação: %s", e)
             return {"success": False, "error": str(e)}
     
     def deploy_model(self, format: str = "onnx") -> Dict[str, Any]:
@@ -161,16 +226,16 @@ class TrainingPipeline(ITrainingPipeline):
         Returns:
             Dict[str, Any]: Informações sobre o modelo exportado.
         """
-        self.logger.info(f"Exportando modelo para formato {format}")
+        logger.info("Exportando modelo para formato %s", format)
         
         try:
             # Exportar modelo
             export_result = self.trainer.export_model(format=format)
-            self.logger.info(f"Exportação concluída: {export_result}")
+            logger.info("Exportação concluída: %s", export_result)
             return export_result
             
         except Exception as e:
-            self.logger.error(f"Erro na exportação: {str(e)}")
+            logger.error("Erro na exportação: %s", e)
             return {"success": False, "error": str(e)}
     
     def run_full_pipeline(self, force_download: bool = False) -> Dict[str, Any]:
@@ -183,7 +248,7 @@ class TrainingPipeline(ITrainingPipeline):
         Returns:
             Dict[str, Any]: Resultados de todas as etapas do pipeline.
         """
-        self.logger.info("Iniciando pipeline completo de treinamento")
+        logger.info("Iniciando pipeline completo de treinamento")
         
         results = {
             "download": False,
@@ -193,20 +258,28 @@ class TrainingPipeline(ITrainingPipeline):
             "deployment": None
         }
         
+        # Download e validação rodam em uma thread de apoio enquanto a thread principal
+        # aquece o treinador (ex.: carregamento dos pesos), escondendo o I/O de rede e
+        # disco. A configuração só é alterada aqui, depois que a preparação termina
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-data") as executor:
+            future = executor.submit(self._download_then_prepare, force_download)
+            self._warm_up_trainer()
+            # Erros inesperados do download ou da validação são propagados aqui
+            download_success, dataset_valid, data_yaml_path = future.result()
+        
         # Download de dados
-        download_success = self.download_data(force=force_download)
         results["download"] = download_success
         
         if not download_success:
-            self.logger.error("Pipeline interrompido: falha no download de dados")
+            logger.error("Pipeline interrompido: falha no download de dados")
             return results
         
         # Preparação de dados
-        preparation_success = self.prepare_data()
+        preparation_success = dataset_valid and self._configure_data_yaml(data_yaml_path)
         results["preparation"] = preparation_success
         
         if not preparation_success:
-            self.logger.error("Pipeline interrompido: falha na preparação de dados")
+            logger.error("Pipeline interrompido: falha na preparação de dados")
             return results
         
         # Treinamento
@@ -214,7 +287,7 @@ class TrainingPipeline(ITrainingPipeline):
         results["training"] = training_results
         
         if not training_results.get("success", False):
-            self.logger.error("Pipeline interrompido: falha no treinamento")
+            logger.error("Pipeline interrompido: falha no treinamento")
             return results
         
         # Avaliação
@@ -225,7 +298,7 @@ class TrainingPipeline(ITrainingPipeline):
         deployment_results = self.deploy_model(format="onnx")
         results["deployment"] = deployment_results
         
-        self.logger.info("Pipeline de treinamento concluído com sucesso")
+        logger.info("Pipeline de treinamento concluído com sucesso")
         return results
     
     def __str__(self) -> str:
@@ -11,18 +11,176 @@ usando a biblioteca ultralytics e injeção de dependência.
 import os
 import logging
 import shutil
+import functools
+import importlib.util
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union, Tuple
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Union, Tuple
 
-try:
+# O ultralytics (e com ele torch e o runtime CUDA) só é importado ao carregar um modelo;
+# aqui apenas verificamos se o pacote está instalado
+ULTRALYTICS_AVAILABLE = importlib.util.find_spec("ultralytics") is not None
+YOLO = None
+
+if TYPE_CHECKING:
     from ultralytics import YOLO
-    ULTRALYTICS_AVAILABLE = True
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
 except ImportError:
-    ULTRALYTICS_AVAILABLE = False
+    PSUTIL_AVAILABLE = False
 
+from src.core.data_management.dataset_validator import count_images, read_yaml_cached
+from src.core.training.cuda_prefetcher import build_prefetch_trainer
 from src.core.training.interface import ITrainer
 from src.core.training.training_config_pydantic import TrainingConfig
 
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Margem de segurança sobre a memória estimada para o cache em RAM (a mesma do ultralytics)
+CACHE_RAM_SAFETY_MARGIN = 0.5
+
+# Formatos aceitos por export_model (comparados em minúsculas)
+_SUPPORTED_FORMATS = frozenset(("onnx", "torchscript", "openvino", "coreml", "tflite", "saved_model", "pb", "trt"))
+
+# Métricas de validação: nome no resultado -> chave em results_dict do ultralytics
+_VAL_METRIC_KEYS = (
+    ("precision", "metrics/precision(B)"),
+    ("recall", "metrics/recall(B)"),
+    ("mAP50", "metrics/mAP50(B)"),
+    ("mAP50-95", "metrics/mAP50-95(B)"),
+)
+
+# Métricas de treinamento: as de validação mais a perda e as épocas concluídas
+_TRAIN_METRIC_KEYS = _VAL_METRIC_KEYS + (
+    ("val_loss", "val/box_loss"),
+    ("epochs_completed", "epoch"),
+)
+
+
+def _read_metrics(results: Any, keys: Tuple[Tuple[str, str], ...]) -> Dict[str, Any]:
+    """
+    Lê as métricas de results_dict de um resultado do ultralytics.
+    
+    Args:
+        results (Any): Resultado de train() ou val() do ultralytics.
+        keys (Tuple[Tuple[str, str], ...]): Pares (nome da métrica, chave em results_dict).
+        
+    Returns:
+        Dict[str, Any]: Métricas encontradas, com 0 para as ausentes.
+    """
+    results_dict = results.results_dict
+    return {name: results_dict.get(key, 0) for name, key in keys}
+
+
+def _get_yolo() -> Any:
+    """
+    Retorna a classe YOLO, importando o ultralytics na primeira chamada.
+    
+    Returns:
+        Any: Classe ultralytics.YOLO.
+    """
+    global YOLO
+    if YOLO is None:
+        from ultralytics import YOLO as _YOLO
+        YOLO = _YOLO
+    return YOLO
+
+
+@functools.lru_cache(maxsize=None)
+def _configure_torch_backends(cudnn_benchmark: bool) -> None:
+    """
+    Ajusta, uma única vez por processo, as flags de desempenho do torch em GPU.
+    
+    O YOLOv8 treina com imgsz fixo (letterbox), então o autotuner do cuDNN escolhe os
+    melhores kernels de convolução na primeira época e os reutiliza. TF32 acelera
+    multiplicações de matrizes e convoluções em GPUs Ampere ou mais novas sem prejuízo
+    perceptível à detecção. Sem CUDA, nada é alterado.
+    
+    Args:
+        cudnn_benchmark (bool): Se True, ativa torch.backends.cudnn.benchmark.
+    """
+    import torch
+    
+    if not torch.cuda.is_available():
+        return
+    
+    torch.backends.cudnn.benchmark = cudnn_benchmark
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.set_float32_matmul_precision("high")
+
+
+def _cuda_device_count() -> int:
+    """
+    Retorna a quantidade de GPUs CUDA visíveis (0 sem CUDA).
+    
+    Returns:
+        int: Número de GPUs.
+    """
+    import torch
+    
+    return torch.cuda.device_count() if torch.cuda.is_available() else 0
+
+
+def _uses_cuda(device: str) -> bool:
+    """
+    Indica se o treinamento com o dispositivo informado vai rodar em GPU CUDA.
+    
+    Args:
+        device (str): Dispositivo do ultralytics ("" para autodetecção, "cpu", "0", "0,1", etc.).
+        
+    Returns:
+        bool: True se o dispositivo não for CPU/MPS e houver GPU CUDA visível.
+    """
+    if str(device).strip().lower() in ("cpu", "mps"):
+        return False
+    return _cuda_device_count() > 0
+
+
+def _to_channels_last(trainer: Any) -> None:
+    """
+    Callback do ultralytics que converte o modelo em treinamento para channels_last.
+    
+    Executado ao final da preparação do treinamento, quando o modelo já está no
+    dispositivo. A conversão só é feita em GPU, onde as convoluções NHWC usam os
+    Tensor Cores; modelos em DDP não são alterados, pois os buckets de gradiente
+    já foram criados com o formato original.
+    
+    Args:
+        trainer (Any): Instância do trainer do ultralytics.
+    """
+    import torch
+    
+    model = trainer.model
+    if isinstance(model, torch.nn.parallel.DistributedDataParallel):
+        return
+    
+    if next(model.parameters()).is_cuda:
+        model.to(memory_format=torch.channels_last)
+
+
+def _compile_model(trainer: Any) -> None:
+    """
+    Callback do ultralytics que compila o modelo em treinamento com torch.compile.
+    
+    Usa nn.Module.compile(), que compila o módulo no próprio lugar: o objeto continua
+    sendo o mesmo DetectionModel, então o EMA, o otimizador e a gravação de checkpoints
+    do ultralytics não são afetados (a versão compilada não é serializada). O modo
+    "reduce-overhead" usa CUDA graphs, por isso a compilação só é feita em GPU.
+    
+    Args:
+        trainer (Any): Instância do trainer do ultralytics.
+    """
+    model = trainer.model
+    if not hasattr(model, "compile"):
+        # torch sem nn.Module.compile (anterior à 2.2)
+        return
+    
+    if next(model.parameters()).is_cuda:
+        model.compile(mode="reduce-overhead", fullgraph=False)
+
 
 class YOLOv8Trainer(ITrainer):
     """
@@ -49,7 +207,7 @@ class YOLOv8Trainer(ITrainer):
             ImportError: Se a biblioteca ultralytics não estiver instalada.
             ValueError: Se a configuração for inválida.
         """
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
         
         # Verificar disponibilidade do ultralytics
         if not ULTRALYTICS_AVAILABLE:
@@ -63,12 +221,43 @@ class YOLOv8Trainer(ITrainer):
         
         self.config = config
         self.model = None
+        self._model_source = None
         self.model_path = None
         self.results_dir = None
         
-        self.logger.info(f"YOLOv8Trainer inicializado com configuração: {self.config}")
+        self.logger.info("YOLOv8Trainer inicializado com configuração: %s", self.config)
+    
+    @property
+    def model_path(self) -> Optional[Path]:
+        """
+        Caminho para o modelo treinado, ou None se ainda não houver um.
+        
+        Returns:
+            Optional[Path]: Caminho do modelo.
+        """
+        return self._model_path
+    
+    @model_path.setter
+    def model_path(self, value: Optional[Union[str, Path]]) -> None:
+        self._model_path = Path(value) if value else None
+        # A existência do arquivo é verificada novamente na próxima consulta
+        self._model_path_exists = None
+    
+    def _has_trained_model(self) -> bool:
+        """
+        Indica se model_path aponta para um arquivo existente.
+        
+        O resultado é guardado até model_path ser alterado, evitando um stat por chamada
+        de train(), validate() e export_model().
+        
+        Returns:
+            bool: True se o modelo treinado existir.
+        """
+        if self._model_path_exists is None:
+            self._model_path_exists = self._model_path is not None and self._model_path.exists()
+        return self._model_path_exists
     
-    def _load_model(self) -> YOLO:
+    def _load_model(self) -> "YOLO":
         """
         Carrega o modelo YOLOv8 baseado na configuração.
         
@@ -81,22 +270,42 @@ class YOLOv8Trainer(ITrainer):
         try:
             model_name = self.config.get_yolo_model_name()
             
-            # Se já tivermos um model_path definido, use-o
-            if self.model_path and Path(self.model_path).exists():
-                self.logger.info(f"Carregando modelo treinado: {self.model_path}")
-                model = YOLO(str(self.model_path))
+            # Se já tivermos um model_path definido, use-o; caso contrário, o modelo padrão
+            trained = self._has_trained_model()
+            source = str(self.model_path) if trained else model_name
+            
+            # Reaproveitar o modelo já carregado da mesma origem (ex.: por warm_up)
+            if self.model is not None and self._model_source == source:
+                return self.model
+            
+            if trained:
+                self.logger.info("Carregando modelo treinado: %s", self.model_path)
             else:
-                # Caso contrário, carregue o modelo padrão
-                self.logger.info(f"Carregando modelo pré-treinado: {model_name}")
-                model = YOLO(model_name)
+                self.logger.info("Carregando modelo pré-treinado: %s", model_name)
+            model = _get_yolo()(source)
+            
+            if self.config.hyperparameters.channels_last:
+                model.add_callback("on_pretrain_routine_end", _to_channels_last)
+            if self.config.hyperparameters.compile:
+                model.add_callback("on_pretrain_routine_end", _compile_model)
             
             self.model = model
+            self._model_source = source
             return model
             
         except Exception as e:
-            self.logger.error(f"Erro ao carregar modelo: {str(e)}")
+            self.logger.error("Erro ao carregar modelo: %s", e)
             raise FileNotFoundError(f"Não foi possível carregar o modelo: {str(e)}")
     
+    def warm_up(self) -> None:
+        """
+        Carrega antecipadamente o modelo, reaproveitado pela próxima chamada de train().
+        
+        Raises:
+            FileNotFoundError: Se o modelo não for encontrado.
+        """
+        self._load_model()
+    
     def train(self, data_yaml_path: Optional[Union[str, Path]] = None, resume: bool = False) -> Dict[str, Any]:
         """
         Treina o modelo YOLOv8 com os parâmetros configurados.
@@ -126,37 +335,129 @@ class YOLOv8Trainer(ITrainer):
             # Carregar o modelo
             model = self._load_model()
             
+            # Flags de GPU (cuDNN benchmark, TF32) antes de o ultralytics montar o trainer
+            _configure_torch_backends(self.config.hyperparameters.cudnn_benchmark)
+            
             # Obter argumentos de treinamento
             training_args = self.config.get_training_args()
             
+            # Com device "auto", usar todas as GPUs visíveis (DDP quando houver mais de uma)
+            if self.config.hyperparameters.device == "auto":
+                training_args.update(self._auto_device_args(training_args["workers"]))
+            
+            # O modo determinístico do ultralytics força algoritmos fixos e anularia o autotuner
+            # do cuDNN: desativá-lo apenas quando o benchmark foi pedido e o treino usa CUDA
+            if self.config.hyperparameters.cudnn_benchmark and _uses_cuda(training_args["device"]):
+                training_args["deterministic"] = False
+            
+            # Escolher o cache de imagens quando não configurado explicitamente
+            if "cache" not in training_args:
+                cache_mode = self._select_cache_mode()
+                if cache_mode is not None:
+                    training_args["cache"] = cache_mode
+            
             # Ajustar para resumir treinamento se solicitado
             if resume and self.results_dir and Path(self.results_dir).exists():
                 training_args["resume"] = True
             
             # Log dos parâmetros de treinamento
-            self.logger.info(f"Iniciando treinamento com parâmetros: {training_args}")
+            self.logger.info("Iniciando treinamento com parâmetros: %s", training_args)
             
-            # Executar treinamento
-            results = model.train(**training_args)
+            # Executar treinamento (com o trainer que pré-carrega os lotes na GPU, se habilitado)
+            if self.config.hyperparameters.cuda_prefetch:
+                results = model.train(trainer=build_prefetch_trainer(), **training_args)
+            else:
+                results = model.train(**training_args)
+            
+            # Os pesos em memória foram alterados pelo treinamento e não correspondem mais à origem
+            self._model_source = None
             
             # Armazenar caminho para o melhor modelo
             if hasattr(results, "best") and Path(results.best).exists():
                 self.model_path = Path(results.best)
-                self.logger.info(f"Melhor modelo salvo em: {self.model_path}")
+                self._model_path_exists = True
+                # Ao final do treino o ultralytics recarrega o melhor checkpoint no próprio
+                # modelo, que então é reaproveitado por validate() e export_model()
+                self._model_source = str(self.model_path)
+                self.logger.info("Melhor modelo salvo em: %s", self.model_path)
             
             # Armazenar diretório de resultados
             if hasattr(results, "save_dir") and Path(results.save_dir).exists():
                 self.results_dir = Path(results.save_dir)
-                self.logger.info(f"Resultados salvos em: {self.results_dir}")
+                self.logger.info("Resultados salvos em: %s", self.results_dir)
             
             # Extrair e retornar métricas
             metrics = self._extract_metrics(results)
             return metrics
             
         except Exception as e:
-            self.logger.error(f"Erro durante o treinamento: {str(e)}")
+            self.logger.error("Erro durante o treinamento: %s", e)
             raise RuntimeError(f"Falha no treinamento: {str(e)}")
     
+    def _auto_device_args(self, workers: int) -> Dict[str, Any]:
+        """
+        Escolhe o dispositivo de treinamento para device="auto".
+        
+        Com várias GPUs, passa a lista "0,1,..." ao ultralytics, que treina em DDP com um
+        processo por GPU; como cada processo cria seus próprios workers do DataLoader, os
+        workers são divididos entre as GPUs (mínimo de 2 por processo). Com uma GPU usa
+        "0" e, sem CUDA, "cpu".
+        
+        Args:
+            workers (int): Workers do DataLoader configurados.
+            
+        Returns:
+            Dict[str, Any]: Argumentos "device" e, em DDP, "workers".
+        """
+        num_gpus = _cuda_device_count()
+        if num_gpus == 0:
+            self.logger.info("Dispositivo automático: CPU")
+            return {"device": "cpu"}
+        
+        if num_gpus == 1:
+            self.logger.info("Dispositivo automático: GPU 0")
+            return {"device": "0"}
+        
+        workers_per_gpu = min(workers, max(2, (os.cpu_count() or 1) // num_gpus))
+        self.logger.info("Dispositivo automático: DDP em %d GPUs, %d workers por GPU", num_gpus, workers_per_gpu)
+        hp = self.config.hyperparameters
+        if hp.cuda_prefetch or hp.compile:
+            # O ultralytics executa o DDP em subprocessos que não recebem o trainer nem os callbacks
+            self.logger.warning("cuda_prefetch e compile não se aplicam ao treinamento em DDP")
+        return {"device": ",".join(str(i) for i in range(num_gpus)), "workers": workers_per_gpu}
+    
+    def _select_cache_mode(self) -> Optional[str]:
+        """
+        Escolhe o cache de imagens do ultralytics para o conjunto de treino.
+        
+        As imagens decodificadas ocupam até img_size x img_size x 3 bytes cada. Se esse
+        volume (com margem de segurança) couber na memória disponível, usa "ram"; caso
+        contrário, "disk", que grava as imagens decodificadas em arquivos .npy.
+        
+        Returns:
+            Optional[str]: "ram", "disk" ou None se não for possível estimar o tamanho.
+        """
+        if not PSUTIL_AVAILABLE:
+            return None
+        
+        try:
+            data_yaml_path = Path(self.config.paths.data_yaml_path)
+            data = read_yaml_cached(data_yaml_path)
+            
+            # Diretório de treino relativo ao "path" do data.yaml ou à pasta do próprio arquivo
+            root = data_yaml_path.parent / data.get("path", "")
+            num_images = count_images(root / data["train"])
+        except (OSError, KeyError, TypeError, AttributeError) as e:
+            self.logger.debug("Não foi possível estimar o tamanho do dataset para o cache: %s", e)
+            return None
+        
+        img_size = self.config.hyperparameters.img_size
+        required = num_images * img_size * img_size * 3 * (1 + CACHE_RAM_SAFETY_MARGIN)
+        cache_mode = "ram" if required < psutil.virtual_memory().available else "disk"
+        
+        self.logger.info("Cache de imagens: %s (%d imagens, ~%.1f GB)", cache_mode, num_images, required / (1 << 30))
+        return cache_mode
+    
     def _extract_metrics(self, results: Any) -> Dict[str, Any]:
         """
         Extrai métricas relevantes dos resultados do treinamento.
@@ -175,14 +476,7 @@ class YOLOv8Trainer(ITrainer):
         
         # Extrair métricas específicas se disponíveis
         if hasattr(results, "results_dict"):
-            metrics.update({
-                "precision": results.results_dict.get("metrics/precision(B)", 0),
-                "recall": results.results_dict.get("metrics/recall(B)", 0),
-                "mAP50": results.results_dict.get("metrics/mAP50(B)", 0),
-                "mAP50-95": results.results_dict.get("metrics/mAP50-95(B)", 0),
-                "val_loss": results.results_dict.get("val/box_loss", 0),
-                "epochs_completed": results.results_dict.get("epoch", 0),
-            })
+            metrics.update(_read_metrics(results, _TRAIN_METRIC_KEYS))
         
         return metrics
     
@@ -197,7 +491,7 @@ class YOLOv8Trainer(ITrainer):
             FileNotFoundError: Se o modelo treinado não for encontrado.
             ValueError: Se o data_yaml_path não estiver definido.
         """
-        if not self.model_path or not Path(self.model_path).exists():
+        if not self._has_trained_model():
             self.logger.error("Modelo treinado não encontrado")
             raise FileNotFoundError("Modelo treinado não encontrado. Execute train() primeiro.")
         
@@ -206,27 +500,21 @@ class YOLOv8Trainer(ITrainer):
             raise ValueError("Data YAML não configurado.")
         
         try:
-            # Carregar o modelo se ainda não estiver carregado
-            if not self.model:
-                self.model = YOLO(str(self.model_path))
+            # Carregar o modelo treinado, a menos que já esteja em memória
+            model = self._load_model()
             
             # Executar validação
-            self.logger.info(f"Validando modelo: {self.model_path}")
-            results = self.model.val(data=str(self.config.paths.data_yaml_path))
+            self.logger.info("Validando modelo: %s", self.model_path)
+            results = model.val(data=str(self.config.paths.data_yaml_path))
             
             # Extrair métricas
-            metrics = {
-                "precision": results.results_dict.get("metrics/precision(B)", 0),
-                "recall": results.results_dict.get("metrics/recall(B)", 0),
-                "mAP50": results.results_dict.get("metrics/mAP50(B)", 0),
-                "mAP50-95": results.results_dict.get("metrics/mAP50-95(B)", 0),
-            }
+            metrics = _read_metrics(results, _VAL_METRIC_KEYS)
             
-            self.logger.info(f"Validação concluída: mAP50={metrics['mAP50']:.4f}, mAP50-95={metrics['mAP50-95']:.4f}")
+            self.logger.info("Validação concluída: mAP50=%.4f, mAP50-95=%.4f", metrics['mAP50'], metrics['mAP50-95'])
             return metrics
             
         except Exception as e:
-            self.logger.error(f"Erro durante a validação: {str(e)}")
+            self.logger.error("Erro durante a validação: %s", e)
             raise RuntimeError(f"Falha na validação: {str(e)}")
     
     def export_model(self, 
@@ -238,58 +526,67 @@ class YOLOv8Trainer(ITrainer):
         Args:
             format (str): Formato de exportação (onnx, torchscript, coreml, etc).
             output_dir (Optional[Union[str, Path]]): Diretório para salvar o modelo exportado.
-                Se None, usa o mesmo diretório do modelo original.
+                Se None, usa o mesmo diretório do modelo original. Caso contrário, o arquivo
+                gerado pelo ultralytics ao lado do modelo é movido (não copiado) para esse
+                diretório, substituindo um arquivo de mesmo nome que já exista lá.
                 
         Returns:
-            Dict[str, Any]: Informações sobre o modelo exportado.
+            Dict[str, Any]: Informações sobre o modelo exportado; "exported_path" aponta
+                para o local final do arquivo.
             
         Raises:
             FileNotFoundError: Se o modelo treinado não for encontrado.
             ValueError: Se o formato não for suportado.
         """
-        if not self.model_path or not Path(self.model_path).exists():
+        if not self._has_trained_model():
             self.logger.error("Modelo treinado não encontrado")
             raise FileNotFoundError("Modelo treinado não encontrado. Execute train() primeiro.")
         
         # Validar formato
-        supported_formats = ["onnx", "torchscript", "openvino", "coreml", "tflite", "saved_model", "pb", "trt"]
-        if format.lower() not in supported_formats:
-            self.logger.error(f"Formato não suportado: {format}")
-            raise ValueError(f"Formato não suportado: {format}. Formatos válidos: {supported_formats}")
+        if format.lower() not in _SUPPORTED_FORMATS:
+            self.logger.error("Formato não suportado: %s", format)
+            raise ValueError(f"Formato não suportado: {format}. Formatos válidos: {sorted(_SUPPORTED_FORMATS)}")
         
         try:
-            # Carregar o modelo se ainda não estiver carregado
-            if not self.model:
-                self.model = YOLO(str(self.model_path))
+            # Carregar o modelo treinado, a menos que já esteja em memória
+            model = self._load_model()
             
             # Definir diretório de saída
             if output_dir:
                 output_dir = Path(output_dir)
                 output_dir.mkdir(parents=True, exist_ok=True)
             else:
-                output_dir = Path(self.model_path).parent
+                output_dir = self.model_path.parent
             
             # Exportar modelo
-            self.logger.info(f"Exportando modelo para formato {format}")
-            exported = self.model.export(format=format, imgsz=self.config.hyperparameters.img_size)
+            self.logger.info("Exportando modelo para formato %s", format)
+            exported = model.export(format=format, imgsz=self.config.hyperparameters.img_size)
             
             # Verificar e mover o modelo exportado se necessário
             exported_path = Path(str(exported))
-            if output_dir != exported_path.parent:
+            if output_dir.resolve() != exported_path.parent.resolve():
                 target_path = output_dir / exported_path.name
-                shutil.copy2(exported_path, target_path)
-                self.logger.info(f"Modelo copiado para: {target_path}")
+                try:
+                    # Mesmo sistema de arquivos: apenas renomeia, sem copiar o conteúdo
+                    os.replace(exported_path, target_path)
+                except OSError:
+                    # Sistemas de arquivos diferentes (ou diretório de destino existente)
+                    shutil.move(exported_path, target_path)
+                self.logger.info("Modelo movido para: %s", target_path)
                 exported_path = target_path
             
+            # Um único stat do arquivo final, depois de uma eventual movimentação
+            size_bytes = os.stat(exported_path).st_size
+            
             return {
                 "success": True,
                 "format": format,
                 "exported_path": str(exported_path),
-                "model_size_mb": round(exported_path.stat().st_size / (1024 * 1024), 2)
+                "model_size_mb": round(size_bytes / (1 << 20), 2)
             }
             
         except Exception as e:
-            self.logger.error(f"Erro durante a exportação: {str(e)}")
+            self.logger.error("Erro durante a exportação: %s", e)
             raise RuntimeError(f"Falha na exportação: {str(e)}")
     
     def __str__(self) -> str:
@@ -305,6 +602,6 @@ class YOLOv8Trainer(ITrainer):
         )
         
         if self.model_path:
-            trainer_str += f"  Modelo: {Path(self.model_path).name}\n"
+            trainer_str += f"  Modelo: {self.model_path.name}\n"
         
         return trainer_str 
\ No newline at end of file
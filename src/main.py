@@ -10,10 +10,11 @@ funcionalidades do projeto: download de dados, treinamento, validação e predi
 
 import os
 import sys
+import hashlib
 import logging
 import argparse
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
 
 # Adicionar o diretório raiz ao sys.path se necessário
 root_dir = Path(__file__).parent.parent
@@ -24,19 +25,22 @@ if str(root_dir) not in sys.path:
 from src.utils.logger import setup_logging
 from src.utils.config_loader import load_yaml_config
 
-# Importar interfaces
-from src.core.data_management.interface import IDataDownloader
-from src.core.training.interface import ITrainer, ITrainingPipeline
+# Configurar logger
+logger = logging.getLogger(__name__)
 
-# Importar implementações concretas
-from src.core.data_management.dataset_validator import DatasetValidator
-from src.core.data_management.roboflow_downloader import RoboflowDownloader
-from src.core.training.training_config_pydantic import TrainingConfig
-from src.core.training.yolov8_trainer import YOLOv8Trainer
-from src.core.training.training_pipeline import TrainingPipeline
+# Diretório de cache do projeto, quando a configuração não define paths.cache_dir
+DEFAULT_CACHE_DIR = ".cache"
 
+# Subdiretório do cache com a impressão digital da última validação de cada dataset
+DATASET_FINGERPRINTS_DIR = "dataset_fingerprints"
 
-def create_pipeline(config_path: str = "config/settings.yml") -> TrainingPipeline:
+# As implementações concretas (pydantic, roboflow, trainer) são importadas apenas ao
+# criar o pipeline, então --help e erros de argumentos respondem sem carregá-las
+if TYPE_CHECKING:
+    from src.core.training.training_pipeline import TrainingPipeline
+
+
+def create_pipeline(config_path: str = "config/settings.yml") -> "TrainingPipeline":
     """
     Cria o pipeline de treinamento com as dependências necessárias.
     
@@ -46,28 +50,95 @@ def create_pipeline(config_path: str = "config/settings.yml") -> TrainingPipelin
     Returns:
         TrainingPipeline: Pipeline de treinamento configurado.
     """
-    logger = logging.getLogger(__name__)
-    logger.info(f"Criando pipeline com configuração: {config_path}")
+    from src.core.data_management.roboflow_downloader import RoboflowDownloader
+    from src.core.training.training_config_pydantic import TrainingConfig
+    from src.core.training.yolov8_trainer import YOLOv8Trainer
+    from src.core.training.training_pipeline import TrainingPipeline
+    
+    logger.info("Criando pipeline com configuração: %s", config_path)
     
     # Carregar configuração
     config = TrainingConfig.from_yaml(config_path)
-    logger.info(f"Configuração carregada: {config}")
+    logger.info("Configuração carregada: %s", config)
     
     # Criar downloader
     downloader = RoboflowDownloader(config_path=config_path)
-    logger.info(f"Downloader criado: {type(downloader).__name__}")
+    logger.info("Downloader criado: %s", type(downloader).__name__)
     
     # Criar trainer
     trainer = YOLOv8Trainer(config=config)
-    logger.info(f"Trainer criado: {type(trainer).__name__}")
+    logger.info("Trainer criado: %s", type(trainer).__name__)
     
     # Criar pipeline
     pipeline = TrainingPipeline(config=config, downloader=downloader, trainer=trainer)
-    logger.info(f"Pipeline criado: {pipeline}")
+    logger.info("Pipeline criado: %s", pipeline)
     
     return pipeline
 
 
+def _dataset_paths(config_path: str) -> Optional[Tuple[Path, Path]]:
+    """
+    Retorna o diretório do dataset do Roboflow e o arquivo com sua impressão digital.
+    
+    A impressão digital fica no diretório de cache do projeto (paths.cache_dir), e não
+    dentro do dataset baixado, identificada pelo caminho absoluto do dataset.
+    
+    Args:
+        config_path (str): Caminho para o arquivo de configuração.
+        
+    Returns:
+        Optional[Tuple[Path, Path]]: Diretório do dataset e arquivo da impressão digital,
+            ou None se a configuração não definir o dataset.
+    """
+    config = load_yaml_config(config_path)
+    try:
+        paths = config["paths"]
+        dataset_dir = Path(paths["processed_data_dir"]) / config["roboflow"]["project"]
+        cache_dir = Path(paths.get("cache_dir") or DEFAULT_CACHE_DIR)
+    except (KeyError, TypeError, AttributeError):
+        return None
+    
+    key = hashlib.blake2b(os.fsencode(dataset_dir.resolve()), digest_size=8).hexdigest()
+    return dataset_dir, cache_dir / DATASET_FINGERPRINTS_DIR / f"{dataset_dir.name}-{key}"
+
+
+def _dataset_unchanged(dataset_dir: Path, fingerprint_file: Path) -> bool:
+    """
+    Verifica se o dataset não mudou desde a última validação bem-sucedida.
+    
+    Args:
+        dataset_dir (Path): Diretório do dataset.
+        fingerprint_file (Path): Arquivo com a impressão digital gravada.
+        
+    Returns:
+        bool: True se a impressão digital gravada corresponder à atual.
+    """
+    from src.core.data_management.dataset_validator import dataset_fingerprint
+    
+    try:
+        stored = fingerprint_file.read_text().strip()
+        return stored == dataset_fingerprint(dataset_dir)
+    except OSError:
+        return False
+
+
+def _store_dataset_fingerprint(dataset_dir: Path, fingerprint_file: Path) -> None:
+    """
+    Grava a impressão digital do dataset validado; falhas são apenas registradas.
+    
+    Args:
+        dataset_dir (Path): Diretório do dataset.
+        fingerprint_file (Path): Arquivo em que a impressão digital é gravada.
+    """
+    from src.core.data_management.dataset_validator import dataset_fingerprint
+    
+    try:
+        fingerprint_file.parent.mkdir(parents=True, exist_ok=True)
+        fingerprint_file.write_text(dataset_fingerprint(dataset_dir))
+    except OSError as e:
+        logger.debug("Não foi possível gravar a impressão digital do dataset: %s", e)
+
+
 def download_data(config_path: str = "config/settings.yml", force: bool = False) -> bool:
     """
     Realiza o download dos dados do Roboflow.
@@ -79,7 +150,6 @@ def download_data(config_path: str = "config/settings.yml", force: bool = False)
     Returns:
         bool: True se o download foi bem-sucedido, False caso contrário.
     """
-    logger = logging.getLogger(__name__)
     logger.info("Iniciando download de dados do Roboflow")
     
     try:
@@ -92,16 +162,26 @@ def download_data(config_path: str = "config/settings.yml", force: bool = False)
             logger.error("Falha no download de dados")
             return False
         
+        # Pular a validação se o dataset não mudou desde a última validação bem-sucedida
+        dataset_paths = _dataset_paths(config_path)
+        if not force and dataset_paths is not None and _dataset_unchanged(*dataset_paths):
+            logger.info("Dataset inalterado desde a última validação em %s", dataset_paths[0])
+            return True
+        
         # Validar dataset
         success = pipeline.prepare_data()
         if not success:
             logger.error("Falha na validação de dados")
             return False
         
+        # Depois da validação, que pode gravar o cache do data.yaml na raiz do dataset
+        if dataset_paths is not None:
+            _store_dataset_fingerprint(*dataset_paths)
+        
         logger.info("Download e validação de dados concluídos com sucesso")
         return True
     except Exception as e:
-        logger.error(f"Erro durante o download de dados: {str(e)}")
+        logger.error("Erro durante o download de dados: %s", e)
         return False
 
 
@@ -117,7 +197,6 @@ def train_model(config_path: str = "config/settings.yml", data_yaml_path: Option
     Returns:
         Dict[str, Any]: Métricas e resultados do treinamento.
     """
-    logger = logging.getLogger(__name__)
     logger.info("Iniciando treinamento de modelo YOLOv8")
     
     try:
@@ -127,19 +206,19 @@ def train_model(config_path: str = "config/settings.yml", data_yaml_path: Option
         # Se data_yaml_path foi fornecido, configurar
         if data_yaml_path:
             pipeline.config.set_data_yaml_path(data_yaml_path)
-            logger.info(f"Usando data.yaml em: {data_yaml_path}")
+            logger.info("Usando data.yaml em: %s", data_yaml_path)
         
         # Treinar modelo
         metrics = pipeline.train_model()
-        logger.info(f"Treinamento concluído. Métricas: {metrics}")
+        logger.info("Treinamento concluído. Métricas: %s", metrics)
         
         # Validar o modelo treinado
         val_metrics = pipeline.evaluate_model()
-        logger.info(f"Validação concluída. Métricas: {val_metrics}")
+        logger.info("Validação concluída. Métricas: %s", val_metrics)
         
         # Exportar para ONNX
         export_result = pipeline.deploy_model(format="onnx")
-        logger.info(f"Modelo exportado: {export_result}")
+        logger.info("Modelo exportado: %s", export_result)
         
         return {
             "training": metrics,
@@ -147,7 +226,7 @@ def train_model(config_path: str = "config/settings.yml", data_yaml_path: Option
             "export": export_result
         }
     except Exception as e:
-        logger.error(f"Erro durante o treinamento: {str(e)}")
+        logger.error("Erro durante o treinamento: %s", e)
         return {"error": str(e), "success": False}
 
 
@@ -162,7 +241,6 @@ def run_full_pipeline(config_path: str = "config/settings.yml", force_download:
     Returns:
         Dict[str, Any]: Resultados de todas as etapas do pipeline.
     """
-    logger = logging.getLogger(__name__)
     logger.info("Iniciando pipeline completo")
     
     try:
@@ -171,11 +249,11 @@ def run_full_pipeline(config_path: str = "config/settings.yml", force_download:
         
         # Executar o pipeline completo
         results = pipeline.run_full_pipeline(force_download=force_download)
-        logger.info(f"Pipeline completo concluído. Resultados: {results}")
+        logger.info("Pipeline completo concluído. Resultados: %s", results)
         
         return results
     except Exception as e:
-        logger.error(f"Erro durante a execução do pipeline: {str(e)}")
+        logger.error("Erro durante a execução do pipeline: %s", e)
         return {"error": str(e), "success": False}
 
 
@@ -197,7 +275,6 @@ def main():
     
     # Configurar logging
     setup_logging()
-    logger = logging.getLogger(__name__)
     
     # Executar o modo selecionado
     if args.mode == "download":
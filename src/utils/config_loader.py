@@ -9,19 +9,64 @@ a partir de arquivos YAML, substituindo variáveis de ambiente quando necessári
 """
 
 import os
+import re
+import functools
 import yaml
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional, Tuple
+
+# Usar o loader em C (libyaml) quando disponível, bem mais rápido que o loader em Python puro
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+# Referências a variáveis de ambiente: ${ENV_VAR} ou ${ENV_VAR:default_value}
+_ENV_RE = re.compile(r"\$\{([^}:]+)(?::([^}]*))?\}")
+
+
+@functools.lru_cache(maxsize=32)
+def _load_yaml_cached(path_str: str, mtime_ns: int, size: int) -> Any:
+    """
+    Lê e analisa um arquivo YAML, memorizando o resultado por caminho e versão do arquivo.
+
+    A chave inclui mtime e tamanho, então uma alteração no arquivo gera uma nova entrada.
+    O resultado em cache não deve ser modificado: _replace_env_vars sempre devolve cópias
+    dos dicionários e listas.
+
+    Args:
+        path_str: Caminho do arquivo YAML.
+        mtime_ns: Data de modificação do arquivo, em nanossegundos.
+        size: Tamanho do arquivo em bytes.
+
+    Returns:
+        Any: Conteúdo do YAML, antes da substituição de variáveis de ambiente.
+    """
+    # Abrir em modo binário: o libyaml lê os bytes UTF-8 diretamente, sem decodificar e recodificar
+    with open(path_str, "rb") as file:
+        return yaml.load(file, Loader=SafeLoader)
+
+
+def clear_config_cache() -> None:
+    """
+    Descarta todos os arquivos YAML memorizados por load_yaml_config.
+
+    Útil quando um arquivo é reescrito sem mudar mtime nem tamanho (ex.: em testes).
+    """
+    _load_yaml_cached.cache_clear()
+
 
 def load_yaml_config(config_path: str) -> Dict[str, Any]:
     """
     Carrega um arquivo YAML de configuração e substitui variáveis de ambiente.
 
+    A análise do arquivo é memorizada enquanto ele não mudar; a substituição de variáveis
+    de ambiente é refeita a cada chamada, refletindo o ambiente atual.
+
     Args:
         config_path: Caminho para o arquivo de configuração YAML.
 
@@ -34,18 +79,20 @@ def load_yaml_config(config_path: str) -> Dict[str, Any]:
     """
     try:
         config_path = Path(config_path)
-        if not config_path.exists():
-            raise FileNotFoundError(f"Arquivo de configuração não encontrado: {config_path}")
+        try:
+            stat = config_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Arquivo de configuração não encontrado: {config_path}") from None
 
-        with open(config_path, "r", encoding="utf-8") as file:
-            # Carregar o YAML
-            config = yaml.safe_load(file)
+        # Carregar o YAML (ou reutilizar a análise anterior do mesmo arquivo)
+        config = _load_yaml_cached(str(config_path.resolve()), stat.st_mtime_ns, stat.st_size)
 
-            # Processar o dicionário para substituir referências a variáveis de ambiente
-            config = _replace_env_vars(config)
+        # Processar o dicionário para substituir referências a variáveis de ambiente,
+        # consultando uma única cópia do ambiente em vez do proxy os.environ a cada referência
+        config = _replace_env_vars(config, os.environ.copy())
 
-            logger.info(f"Configurações carregadas com sucesso de {config_path}")
-            return config
+        logger.info(f"Configurações carregadas com sucesso de {config_path}")
+        return config
     except FileNotFoundError as e:
         logger.error(f"Erro ao carregar configuração: {str(e)}")
         raise
@@ -57,54 +104,100 @@ def load_yaml_config(config_path: str) -> Dict[str, Any]:
         raise
 
 
-def _replace_env_vars(config: Any) -> Any:
+def _replace_env_vars(config: Any, env: Optional[Mapping[str, str]] = None) -> Any:
     """
     Substitui referências a variáveis de ambiente em um dicionário de configuração.
 
     Formato de referência: ${ENV_VAR} ou ${ENV_VAR:default_value}
 
+    Cada referência distinta é resolvida uma única vez por chamada, mesmo que se repita
+    em vários valores da configuração.
+
     Args:
         config: Configuração para processar (dict, list, str, etc.)
+        env: Variáveis de ambiente a consultar; se None, usa uma cópia de os.environ
 
     Returns:
         Configuração com variáveis de ambiente substituídas
     """
-    if isinstance(config, dict):
-        return {key: _replace_env_vars(value) for key, value in config.items()}
+    return _substitute(config, os.environ.copy() if env is None else env, {})
+
+
+def _substitute(config: Any, env: Mapping[str, str], resolved: Dict[str, str]) -> Any:
+    """
+    Percorre a configuração substituindo as referências pelos valores do ambiente.
+
+    Args:
+        config: Configuração para processar (dict, list, str, etc.)
+        env: Variáveis de ambiente a consultar
+        resolved: Valores já resolvidos nesta chamada, indexados pelo texto da referência
+
+    Returns:
+        Configuração com variáveis de ambiente substituídas
+    """
+    if isinstance(config, str):
+        # Só acionar o regex quando houver alguma referência na string
+        if "${" not in config:
+            return config
+
+        def lookup(match: "re.Match[str]") -> str:
+            value = resolved.get(match.group(0))
+            if value is None:
+                value = resolved.setdefault(match.group(0), _sub_env_var(env, match))
+            return value
+
+        return _ENV_RE.sub(lookup, config)
+    elif isinstance(config, dict):
+        return {key: _substitute(value, env, resolved) for key, value in config.items()}
     elif isinstance(config, list):
-        return [_replace_env_vars(item) for item in config]
-    elif isinstance(config, str) and "${" in config and "}" in config:
-        # Substituir variáveis de ambiente na string
-        result = config
-        start_pos = result.find("${")
-        while start_pos >= 0:
-            end_pos = result.find("}", start_pos)
-            if end_pos < 0:
-                break
-
-            env_var = result[start_pos + 2 : end_pos]
-            default_value = None
-
-            # Verificar se há um valor padrão
-            if ":" in env_var:
-                env_var, default_value = env_var.split(":", 1)
-
-            env_value = os.environ.get(env_var, default_value)
-            if env_value is None:
-                logger.warning(f"Variável de ambiente '{env_var}' não encontrada e sem valor padrão")
-                # Manter a referência original se não houver valor
-                env_value = f"${{{env_var}}}"
-
-            # Substituir na string
-            result = result[:start_pos] + str(env_value) + result[end_pos + 1 :]
-            # Procurar a próxima ocorrência
-            start_pos = result.find("${", start_pos)
-
-        return result
+        return [_substitute(item, env, resolved) for item in config]
     else:
+        # Números, booleanos e None não têm o que substituir
         return config
 
 
+def _sub_env_var(env: Mapping[str, str], match: "re.Match[str]", expand: bool = True) -> str:
+    """
+    Resolve uma referência ${ENV_VAR[:default_value]} encontrada por _ENV_RE.
+
+    Se o valor obtido também contiver referências, elas são substituídas uma vez; os
+    valores dessa segunda substituição são usados como estão, evitando ciclos.
+
+    Args:
+        env: Variáveis de ambiente a consultar.
+        match: Ocorrência da referência na string.
+        expand: Se True, substitui as referências contidas no valor obtido.
+
+    Returns:
+        str: Valor da variável, o valor padrão, ou a referência original se nenhum existir.
+    """
+    env_var, default_value = match.group(1), match.group(2)
+    env_value = env.get(env_var, default_value)
+    if env_value is None:
+        logger.warning(f"Variável de ambiente '{env_var}' não encontrada e sem valor padrão")
+        # Manter a referência original se não houver valor
+        return match.group(0)
+    if expand and "${" in env_value:
+        return _ENV_RE.sub(lambda inner: _sub_env_var(env, inner, expand=False), env_value)
+    return env_value
+
+
+@functools.lru_cache(maxsize=256)
+def _field_path(field: str) -> Tuple[str, ...]:
+    """
+    Divide o caminho de um campo obrigatório ("secao.campo") em suas chaves.
+
+    Memorizado, pois os mesmos esquemas de campos costumam ser validados repetidas vezes.
+
+    Args:
+        field: Caminho do campo, com as chaves separadas por ponto.
+
+    Returns:
+        Tuple[str, ...]: Chaves do caminho, da mais externa para a mais interna.
+    """
+    return tuple(field.split("."))
+
+
 def validate_config(config: Dict[str, Any], required_fields: Optional[Dict[str, Any]] = None) -> bool:
     """
     Valida se a configuração contém todos os campos obrigatórios.
@@ -120,11 +213,10 @@ def validate_config(config: Dict[str, Any], required_fields: Optional[Dict[str,
         return True
 
     for field, expected_type in required_fields.items():
-        parts = field.split(".")
         current = config
 
         # Navegar pela estrutura aninhada
-        for part in parts:
+        for part in _field_path(field):
             if not isinstance(current, dict) or part not in current:
                 logger.error(f"Campo obrigatório não encontrado: {field}")
                 return False
@@ -10,6 +10,7 @@ fornecendo uma interface consistente para registro de logs em toda a aplicação
 
 import os
 import logging
+import functools
 import logging.config
 from pathlib import Path
 from typing import Dict, Any
@@ -84,10 +85,14 @@ def _process_file_handlers(config: Dict[str, Any]) -> None:
             log_file.parent.mkdir(exist_ok=True, parents=True)
 
 
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
     Obtém um logger configurado para um módulo específico.
 
+    Loggers nunca são removidos pelo módulo logging, então o resultado é memorizado por
+    nome, evitando a trava global de logging.getLogger em chamadas repetidas.
+
     Args:
         name: Nome do logger (geralmente __name__ do módulo)
 
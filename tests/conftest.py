@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Fixtures compartilhadas pelos testes.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cwd(tmp_path, monkeypatch):
+    """
+    Executa cada teste em seu próprio diretório temporário.
+    
+    Caminhos relativos criados pelos testes (ex.: models/test) ficam isolados por teste,
+    o que permite executar a suíte em paralelo (pytest -n auto) sem disputas no diretório atual.
+    """
+    monkeypatch.chdir(tmp_path)
@@ -6,38 +6,46 @@ Testes para o módulo de carregamento de configurações.
 """
 
 import os
-import tempfile
 from pathlib import Path
 import pytest
-from src.utils.config_loader import load_yaml_config, _replace_env_vars, validate_config
+from src.utils.config_loader import load_yaml_config, clear_config_cache, _replace_env_vars, validate_config
 
 
-def test_load_yaml_config():
+# Conteúdo do arquivo YAML de exemplo
+SAMPLE_YAML = b"""
+project:
+  name: Test Project
+  version: 1.0.0
+paths:
+  data_dir: data
+"""
+
+
+@pytest.fixture(scope="module")
+def sample_yaml(tmp_path_factory):
+    """Arquivo YAML de exemplo, escrito uma única vez por módulo."""
+    path = tmp_path_factory.mktemp("cfg") / "cfg.yml"
+    path.write_bytes(SAMPLE_YAML)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_config_cache():
+    """Garante que cada teste comece sem arquivos YAML em cache."""
+    clear_config_cache()
+    yield
+    clear_config_cache()
+
+
+def test_load_yaml_config(sample_yaml):
     """Testa o carregamento de configurações a partir de arquivos YAML."""
-    # Criar um arquivo YAML temporário para teste
-    with tempfile.NamedTemporaryFile(suffix=".yml", delete=False) as temp_file:
-        yaml_content = """
-        project:
-          name: Test Project
-          version: 1.0.0
-        paths:
-          data_dir: data
-        """
-        temp_file.write(yaml_content.encode("utf-8"))
-        temp_path = temp_file.name
-
-    try:
-        # Carregar a configuração
-        config = load_yaml_config(temp_path)
-
-        # Verificar se os valores foram carregados corretamente
-        assert config["project"]["name"] == "Test Project"
-        assert config["project"]["version"] == "1.0.0"
-        assert config["paths"]["data_dir"] == "data"
-    finally:
-        # Limpar o arquivo temporário
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+    # Carregar a configuração
+    config = load_yaml_config(sample_yaml)
+
+    # Verificar se os valores foram carregados corretamente
+    assert config["project"]["name"] == "Test Project"
+    assert config["project"]["version"] == "1.0.0"
+    assert config["paths"]["data_dir"] == "data"
 
 
 def test_load_yaml_config_file_not_found():
@@ -46,6 +54,39 @@ def test_load_yaml_config_file_not_found():
         load_yaml_config("non_existent_file.yml")
 
 
+def test_load_yaml_config_cached_copies(tmp_path, monkeypatch):
+    """Testa se o cache do YAML devolve cópias independentes e respeita o ambiente atual."""
+    config_path = tmp_path / "config.yml"
+    config_path.write_text("api:\n  key: ${CACHE_TEST_KEY:padrao}\n  tags: [a]\n", encoding="utf-8")
+
+    # Modificar o resultado não deve afetar as próximas leituras
+    config = load_yaml_config(str(config_path))
+    config["api"]["tags"].append("b")
+    assert config["api"]["key"] == "padrao"
+
+    # A substituição de variáveis de ambiente é refeita mesmo com o arquivo em cache
+    monkeypatch.setenv("CACHE_TEST_KEY", "segredo")
+    config = load_yaml_config(str(config_path))
+    assert config["api"] == {"key": "segredo", "tags": ["a"]}
+
+
+def test_clear_config_cache(tmp_path):
+    """Testa se clear_config_cache força uma nova leitura do arquivo."""
+    config_path = tmp_path / "config.yml"
+    config_path.write_text("valor: 1\n", encoding="utf-8")
+    stat = config_path.stat()
+
+    assert load_yaml_config(str(config_path)) == {"valor": 1}
+
+    # Reescrever com o mesmo tamanho e mtime não é detectado pelo cache
+    config_path.write_text("valor: 2\n", encoding="utf-8")
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert load_yaml_config(str(config_path)) == {"valor": 1}
+
+    clear_config_cache()
+    assert load_yaml_config(str(config_path)) == {"valor": 2}
+
+
 def test_replace_env_vars():
     """Testa a substituição de variáveis de ambiente nas configurações."""
     # Configurar variáveis de ambiente para teste
@@ -77,6 +118,41 @@ def test_replace_env_vars():
     assert replaced_list[2] == "no_replacement"
 
 
+def test_replace_env_vars_missing_and_default(monkeypatch):
+    """Testa variáveis ausentes (referência mantida) e valores padrão."""
+    monkeypatch.delenv("MISSING_TEST_VAR", raising=False)
+
+    # Variável ausente sem padrão mantém a referência original
+    assert _replace_env_vars("${MISSING_TEST_VAR}") == "${MISSING_TEST_VAR}"
+
+    # Valor padrão é usado quando a variável não existe
+    assert _replace_env_vars("a_${MISSING_TEST_VAR:b}_${MISSING_TEST_VAR:}") == "a_b_"
+
+
+def test_replace_env_vars_resolves_each_reference_once(caplog):
+    """Testa se referências repetidas são resolvidas (e avisadas) uma única vez."""
+    config = {"a": "${MISSING_TEST_VAR}", "b": ["${MISSING_TEST_VAR}", "x_${MISSING_TEST_VAR}"]}
+
+    with caplog.at_level("WARNING"):
+        replaced = _replace_env_vars(config, env={})
+
+    assert replaced == config
+    assert sum("MISSING_TEST_VAR" in record.getMessage() for record in caplog.records) == 1
+
+
+def test_replace_env_vars_expands_nested_references_once():
+    """Testa se referências dentro de valores são substituídas em um único nível."""
+    env = {"ROOT": "/data", "DATA_DIR": "${ROOT}/train", "LOOP": "${LOOP}", "OUTER": "${DATA_DIR}"}
+
+    # O valor da variável tem suas referências substituídas
+    assert _replace_env_vars("${DATA_DIR}", env=env) == "/data/train"
+    assert _replace_env_vars({"a": ["x_${DATA_DIR}"]}, env=env) == {"a": ["x_/data/train"]}
+
+    # O segundo nível é mantido como está, sem recursão (nem ciclos)
+    assert _replace_env_vars("${OUTER}", env=env) == "${ROOT}/train"
+    assert _replace_env_vars("${LOOP}", env=env) == "${LOOP}"
+
+
 def test_validate_config():
     """Testa a validação de configurações."""
     # Configuração válida
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o pré-carregamento de lotes na GPU, executados em CPU.
+"""
+
+import sys
+import types
+import contextlib
+from unittest.mock import MagicMock
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.core.training.cuda_prefetcher import CUDAPrefetcher, build_prefetch_trainer
+
+
+# Dispositivo de destino simulado
+DEVICE = types.SimpleNamespace(type="cuda", index=0)
+
+
+class _FakeTensor:
+    """Tensor mínimo que registra cópias para o dispositivo e streams associados."""
+
+    def __init__(self, value, is_cuda=False):
+        self.value = value
+        self.is_cuda = is_cuda
+        self.copies = []
+        self.streams = []
+
+    def to(self, device, non_blocking=False):
+        self.copies.append((device, non_blocking))
+        return _FakeTensor(self.value, is_cuda=True)
+
+    def record_stream(self, stream):
+        self.streams.append(stream)
+
+
+class _Loader:
+    """DataLoader simulado com atributos extras a serem delegados."""
+
+    def __init__(self, batches):
+        self.batches = batches
+        self.dataset = "dataset"
+        self.reset = MagicMock()
+
+    def __iter__(self):
+        return iter(self.batches)
+
+    def __len__(self):
+        return len(self.batches)
+
+
+@pytest.fixture
+def cuda(monkeypatch):
+    """Substitui os streams CUDA do torch para rodar o prefetcher sem GPU."""
+    prefetch_stream = MagicMock(name="prefetch_stream")
+    current_stream = MagicMock(name="current_stream")
+    entered = []
+
+    @contextlib.contextmanager
+    def stream(s):
+        entered.append(s)
+        yield
+
+    monkeypatch.setattr(torch.cuda, "Stream", MagicMock(return_value=prefetch_stream))
+    monkeypatch.setattr(torch.cuda, "current_stream", MagicMock(return_value=current_stream))
+    monkeypatch.setattr(torch.cuda, "stream", stream)
+    return types.SimpleNamespace(prefetch=prefetch_stream, current=current_stream, entered=entered)
+
+
+def test_prefetcher_yields_batches_in_order(cuda):
+    """Testa se os lotes saem na ordem, copiados no stream dedicado."""
+    batches = [{"img": _FakeTensor(i), "cls": _FakeTensor(-i), "im_file": f"{i}.jpg"} for i in range(3)]
+    prefetcher = CUDAPrefetcher(_Loader(batches), DEVICE, keys=("img",))
+
+    out = list(prefetcher)
+
+    assert [batch["img"].value for batch in out] == [0, 1, 2]
+    assert all(batch["img"].is_cuda for batch in out)
+    assert [batch["im_file"] for batch in out] == ["0.jpg", "1.jpg", "2.jpg"]
+    assert all(batch["img"].copies == [(DEVICE, True)] for batch in batches)
+
+    # Chaves fora de keys não são copiadas
+    assert all(batch["cls"] is original["cls"] for batch, original in zip(out, batches))
+    assert cuda.entered == [cuda.prefetch] * 3
+    torch.cuda.Stream.assert_called_once_with(device=DEVICE)
+
+
+def test_prefetcher_copies_nested_batches(cuda):
+    """Testa se lotes em lista/tupla têm todos os tensores copiados."""
+    batches = [(_FakeTensor(0), [_FakeTensor(1), "meta"])]
+
+    (batch,) = list(CUDAPrefetcher(_Loader(batches), DEVICE))
+
+    assert isinstance(batch, tuple) and isinstance(batch[1], list)
+    assert batch[0].is_cuda and batch[1][0].is_cuda
+    assert batch[1][1] == "meta"
+
+
+def test_prefetcher_records_stream_before_yielding(cuda):
+    """Testa se cada lote aguarda a cópia e é associado ao stream que o consome."""
+    prefetcher = CUDAPrefetcher(_Loader([{"img": _FakeTensor(i)} for i in range(2)]), DEVICE)
+
+    for batch in prefetcher:
+        assert batch["img"].streams == [cuda.current]
+
+    assert cuda.current.wait_stream.call_count == 2
+    cuda.current.wait_stream.assert_called_with(cuda.prefetch)
+    torch.cuda.current_stream.assert_called_with(DEVICE)
+
+
+def test_prefetcher_delegates_to_loader(cuda):
+    """Testa se __len__ e os atributos ausentes são delegados ao DataLoader."""
+    loader = _Loader([{"img": _FakeTensor(0)}] * 4)
+    prefetcher = CUDAPrefetcher(loader, DEVICE)
+
+    assert len(prefetcher) == 4
+    assert prefetcher.dataset == "dataset"
+    prefetcher.reset()
+    loader.reset.assert_called_once_with()
+    with pytest.raises(AttributeError):
+        prefetcher.missing_attribute
+
+
+@pytest.fixture
+def prefetch_trainer(monkeypatch, cuda):
+    """Cria o trainer de pré-carregamento sobre um DetectionTrainer simulado."""
+    class DetectionTrainer:
+        def __init__(self, device_type):
+            self.device = types.SimpleNamespace(type=device_type)
+
+        def get_dataloader(self, dataset_path, batch_size=16, rank=0, mode="train"):
+            return _Loader([])
+
+    detect = types.ModuleType("ultralytics.models.yolo.detect")
+    detect.DetectionTrainer = DetectionTrainer
+    for name in ("ultralytics", "ultralytics.models", "ultralytics.models.yolo"):
+        monkeypatch.setitem(sys.modules, name, types.ModuleType(name))
+    monkeypatch.setitem(sys.modules, "ultralytics.models.yolo.detect", detect)
+
+    build_prefetch_trainer.cache_clear()
+    yield build_prefetch_trainer()
+    build_prefetch_trainer.cache_clear()
+
+
+@pytest.mark.parametrize("device_type, mode, wrapped", [
+    ("cuda", "train", True),
+    ("cuda", "val", False),
+    ("cpu", "train", False),
+])
+def test_prefetch_trainer_get_dataloader(prefetch_trainer, device_type, mode, wrapped):
+    """Testa se apenas o DataLoader de treino em GPU é envolvido pelo prefetcher."""
+    loader = prefetch_trainer(device_type).get_dataloader("data", mode=mode)
+
+    assert isinstance(loader, CUDAPrefetcher) is wrapped
+    if wrapped:
+        assert loader.keys == ("img",)
+        assert isinstance(loader.loader, _Loader)
@@ -6,22 +6,39 @@ Testes para o módulo de validação de datasets.
 """
 
 import os
-import shutil
-import tempfile
 import pytest
 import yaml
 from pathlib import Path
 
-from src.core.data_management.dataset_validator import DatasetValidator
+from src.core.data_management.dataset_validator import DatasetValidator, dataset_fingerprint, read_yaml_cached
 
+# Gravar os data.yaml com o dumper em C (libyaml) quando disponível, como os loaders do projeto
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
 
-@pytest.fixture
-def valid_dataset():
-    """Cria um dataset válido temporário para testes."""
-    # Criar diretório temporário
-    temp_dir = tempfile.mkdtemp()
-    dataset_path = Path(temp_dir)
-    
+# Conteúdo de cada arquivo de label dos datasets de teste
+LABEL_CONTENT = b"0 0.5 0.5 0.1 0.1\n"
+
+# Nomes dos arquivos de cada subconjunto, calculados uma única vez
+IMAGE_NAMES = [f"img_{i}.jpg" for i in range(5)]
+LABEL_NAMES = [f"img_{i}.txt" for i in range(5)]
+
+
+def _write_files(directory: Path, names, content: bytes = b"") -> None:
+    """Cria os arquivos com o conteúdo informado direto por descritor, sem objetos de arquivo."""
+    for name in names:
+        fd = os.open(directory / name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if content:
+                os.write(fd, content)
+        finally:
+            os.close(fd)
+
+
+def _build_valid_dataset(dataset_path: Path) -> Path:
+    """Cria um dataset válido no diretório informado."""
     # Criar estrutura do dataset
     for subset in ["train", "val", "test"]:
         # Criar diretórios de imagens
@@ -32,16 +49,9 @@ def valid_dataset():
         labels_dir = dataset_path / "labels" / subset
         labels_dir.mkdir(parents=True, exist_ok=True)
         
-        # Criar algumas imagens e labels
-        for i in range(5):
-            # Criar arquivo de imagem vazio
-            image_file = images_dir / f"img_{i}.jpg"
-            image_file.touch()
-            
-            # Criar arquivo de label correspondente
-            label_file = labels_dir / f"img_{i}.txt"
-            with open(label_file, "w") as f:
-                f.write("0 0.5 0.5 0.1 0.1\n")
+        # Criar algumas imagens (vazias) e labels correspondentes
+        _write_files(images_dir, IMAGE_NAMES)
+        _write_files(labels_dir, LABEL_NAMES, LABEL_CONTENT)
     
     # Criar arquivo data.yaml
     data_yaml = {
@@ -56,20 +66,27 @@ def valid_dataset():
     }
     
     with open(dataset_path / "data.yaml", "w") as f:
-        yaml.dump(data_yaml, f)
-    
-    yield dataset_path
+        yaml.dump(data_yaml, f, Dumper=SafeDumper)
     
-    # Limpar após os testes
-    shutil.rmtree(temp_dir)
+    return dataset_path
+
+
+@pytest.fixture(scope="session")
+def valid_dataset(tmp_path_factory):
+    """Dataset válido compartilhado pela sessão; os testes que o usam apenas o leem."""
+    return _build_valid_dataset(tmp_path_factory.mktemp("valid_ds"))
 
 
 @pytest.fixture
-def invalid_dataset():
-    """Cria um dataset inválido temporário para testes."""
-    # Criar diretório temporário
-    temp_dir = tempfile.mkdtemp()
-    dataset_path = Path(temp_dir)
+def mutable_valid_dataset(tmp_path):
+    """Dataset válido exclusivo do teste, para testes que alteram arquivos."""
+    return _build_valid_dataset(tmp_path)
+
+
+@pytest.fixture(scope="session")
+def invalid_dataset(tmp_path_factory):
+    """Dataset inválido compartilhado pela sessão; os testes que o usam apenas o leem."""
+    dataset_path = tmp_path_factory.mktemp("invalid_ds")
     
     # Criar estrutura parcial (apenas train, sem test e val)
     images_dir = dataset_path / "images" / "train"
@@ -79,16 +96,10 @@ def invalid_dataset():
     labels_dir.mkdir(parents=True, exist_ok=True)
     
     # Criar algumas imagens e labels com discrepância
-    for i in range(5):
-        # Criar arquivo de imagem vazio
-        image_file = images_dir / f"img_{i}.jpg"
-        image_file.touch()
-        
-        # Criar apenas 3 labels (omitindo 2 para testar discrepância)
-        if i < 3:
-            label_file = labels_dir / f"img_{i}.txt"
-            with open(label_file, "w") as f:
-                f.write("0 0.5 0.5 0.1 0.1\n")
+    _write_files(images_dir, IMAGE_NAMES)
+    
+    # Criar apenas 3 labels (omitindo 2 para testar discrepância)
+    _write_files(labels_dir, LABEL_NAMES[:3], LABEL_CONTENT)
     
     # Criar arquivo data.yaml incompleto
     data_yaml = {
@@ -101,12 +112,9 @@ def invalid_dataset():
     }
     
     with open(dataset_path / "data.yaml", "w") as f:
-        yaml.dump(data_yaml, f)
+        yaml.dump(data_yaml, f, Dumper=SafeDumper)
     
-    yield dataset_path
-    
-    # Limpar após os testes
-    shutil.rmtree(temp_dir)
+    return dataset_path
 
 
 def test_validate_valid_dataset(valid_dataset):
@@ -118,10 +126,8 @@ def test_validate_valid_dataset(valid_dataset):
     
     # Verificar resultado
     assert valid is True
-    assert stats["train_images"] == 5
-    assert stats["valid_images"] == 5
-    assert stats["test_images"] == 5
-    assert stats["classes"] == 2
+    counts = {key: stats[key] for key in ("train_images", "valid_images", "test_images", "classes")}
+    assert counts == {"train_images": 5, "valid_images": 5, "test_images": 5, "classes": 2}
 
 
 def test_validate_invalid_dataset(invalid_dataset):
@@ -179,4 +185,80 @@ def test_check_images_annotations_invalid(invalid_dataset):
     valid = validator.check_images_annotations(invalid_dataset)
     
     # Verificar resultado
-    assert valid is False 
\ No newline at end of file
+    assert valid is False
+
+
+def test_yaml_cache_invalidated_on_change(mutable_valid_dataset):
+    """Testa o cache em memória do data.yaml e sua invalidação quando o arquivo muda."""
+    validator = DatasetValidator()
+    yaml_path = mutable_valid_dataset / "data.yaml"
+    entries = sorted(os.listdir(mutable_valid_dataset))
+    
+    # A validação não grava nada no diretório do dataset
+    valid, stats = validator.validate(mutable_valid_dataset)
+    assert valid is True
+    assert sorted(os.listdir(mutable_valid_dataset)) == entries
+    
+    # Leituras seguintes reaproveitam a análise e mantêm os IDs numéricos das classes
+    assert read_yaml_cached(yaml_path) is read_yaml_cached(yaml_path)
+    valid, stats = validator.validate(mutable_valid_dataset)
+    assert valid is True
+    assert stats["class_names"] == ["class1", "class2"]
+    
+    # Alterar o YAML deve invalidar o cache
+    with open(yaml_path, "w") as f:
+        yaml.dump({"path": str(mutable_valid_dataset), "train": "images/train", "names": {0: "class1"}}, f, Dumper=SafeDumper)
+    
+    assert validator.check_yaml(yaml_path) is False
+
+
+def test_validate_mixed_case_extensions(mutable_valid_dataset):
+    """Testa se imagens com extensões em maiúsculas ou .jpeg são reconhecidas."""
+    validator = DatasetValidator()
+    
+    # Adicionar imagens com extensões alternativas e suas anotações
+    for name in ["extra_upper.JPG", "extra_jpeg.jpeg"]:
+        (mutable_valid_dataset / "images" / "train" / name).write_bytes(b"")
+        (mutable_valid_dataset / "labels" / "train" / f"{Path(name).stem}.txt").write_bytes(LABEL_CONTENT)
+    
+    valid, stats = validator.validate(mutable_valid_dataset)
+    
+    assert valid is True
+    assert stats["train_images"] == 7
+
+
+def test_check_images_annotations_same_count_different_names(mutable_valid_dataset):
+    """Testa se nomes divergentes são detectados mesmo com a mesma quantidade de arquivos."""
+    validator = DatasetValidator()
+    
+    # Renomear uma anotação mantendo a quantidade de arquivos igual à de imagens
+    labels_dir = mutable_valid_dataset / "labels" / "val"
+    (labels_dir / "img_0.txt").rename(labels_dir / "outro_nome.txt")
+    
+    assert validator.check_images_annotations(mutable_valid_dataset) is False
+
+
+def test_dataset_fingerprint(mutable_valid_dataset):
+    """Testa se a impressão digital muda apenas quando a estrutura do dataset muda."""
+    fingerprint = dataset_fingerprint(mutable_valid_dataset)
+    assert dataset_fingerprint(mutable_valid_dataset) == fingerprint
+    
+    # Uma nova imagem altera o mtime de images/train
+    (mutable_valid_dataset / "images" / "train" / "img_novo.jpg").touch()
+    os.utime(mutable_valid_dataset / "images" / "train", ns=(0, 0))
+    assert dataset_fingerprint(mutable_valid_dataset) != fingerprint
+
+
+def test_dataset_fingerprint_data_yaml(mutable_valid_dataset):
+    """Testa se o data.yaml altera a impressão digital e outros arquivos da raiz não."""
+    fingerprint = dataset_fingerprint(mutable_valid_dataset)
+    
+    # Arquivos soltos na raiz não fazem parte da impressão digital
+    (mutable_valid_dataset / "README.txt").write_bytes(b"leia-me\n")
+    assert dataset_fingerprint(mutable_valid_dataset) == fingerprint
+    
+    # O data.yaml reescrito com o mesmo tamanho é detectado pelo mtime
+    yaml_path = mutable_valid_dataset / "data.yaml"
+    yaml_path.write_bytes(yaml_path.read_bytes())
+    os.utime(yaml_path, ns=(0, 0))
+    assert dataset_fingerprint(mutable_valid_dataset) != fingerprint
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o script principal.
+"""
+
+import pytest
+
+from src import main
+
+
+class _StubPipeline:
+    """Pipeline que apenas conta as chamadas de download e de validação."""
+    
+    def __init__(self):
+        self.downloads = 0
+        self.preparations = 0
+    
+    def download_data(self, force=False):
+        self.downloads += 1
+        return True
+    
+    def prepare_data(self):
+        self.preparations += 1
+        return True
+
+
+@pytest.fixture
+def dataset_config(tmp_path):
+    """Configuração com o dataset e o cache do projeto em tmp_path."""
+    dataset_dir = tmp_path / "data" / "proj"
+    (dataset_dir / "train" / "images").mkdir(parents=True)
+    (dataset_dir / "data.yaml").write_bytes(b"names: [a]\n")
+    
+    config_path = tmp_path / "settings.yml"
+    config_path.write_text(
+        f"paths:\n  processed_data_dir: {tmp_path / 'data'}\n  cache_dir: {tmp_path / 'cache'}\n"
+        "roboflow:\n  project: proj\n"
+    )
+    return str(config_path), dataset_dir
+
+
+@pytest.fixture
+def stub_pipeline(monkeypatch):
+    """Substitui create_pipeline por um pipeline de teste."""
+    pipeline = _StubPipeline()
+    monkeypatch.setattr(main, "create_pipeline", lambda config_path: pipeline)
+    return pipeline
+
+
+def test_download_data_skips_validation_of_unchanged_dataset(dataset_config, stub_pipeline):
+    """Testa se a segunda execução pula a validação de um dataset inalterado."""
+    config_path, dataset_dir = dataset_config
+    
+    assert main.download_data(config_path) is True
+    assert main.download_data(config_path) is True
+    assert (stub_pipeline.downloads, stub_pipeline.preparations) == (2, 1)
+    
+    # Nada é gravado dentro do dataset
+    assert sorted(path.name for path in dataset_dir.iterdir()) == ["data.yaml", "train"]
+    
+    # force valida novamente
+    assert main.download_data(config_path, force=True) is True
+    assert stub_pipeline.preparations == 2
+
+
+def test_download_data_revalidates_changed_dataset(dataset_config, stub_pipeline):
+    """Testa se um dataset alterado é validado novamente."""
+    config_path, dataset_dir = dataset_config
+    
+    assert main.download_data(config_path) is True
+    (dataset_dir / "valid").mkdir()
+    assert main.download_data(config_path) is True
+    
+    assert stub_pipeline.preparations == 2
@@ -6,37 +6,60 @@ Testes para o módulo de download do Roboflow.
 """
 
 import os
-import tempfile
 import pytest
 from pathlib import Path
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import DEFAULT, Mock, patch
 
 from src.core.data_management.roboflow_downloader import RoboflowDownloader
 
 
-# Configuração de mock para roboflow
+class _StubVersion:
+    """Versão de dataset do Roboflow que apenas registra as chamadas de download."""
+    
+    def __init__(self):
+        self.download_calls = []
+        self.error = None
+    
+    def download(self, model_format, location=None):
+        self.download_calls.append((model_format, location))
+        if self.error is not None:
+            raise self.error
+        return object()
+
+
+class _StubRoboflow:
+    """
+    Substituto leve da classe Roboflow.
+    
+    Chamado como a classe, registra a api_key e devolve a si mesmo; workspace() e
+    project() também devolvem o próprio stub, e version() devolve a versão registrada.
+    """
+    
+    def __init__(self):
+        self.api_keys = []
+        self.dataset_version = _StubVersion()
+    
+    def __call__(self, api_key):
+        self.api_keys.append(api_key)
+        return self
+    
+    def workspace(self, name):
+        return self
+    
+    def project(self, name):
+        return self
+    
+    def version(self, number):
+        return self.dataset_version
+
+
+# Configuração de stub para roboflow
 @pytest.fixture
 def mock_roboflow():
-    """Mock para a biblioteca Roboflow."""
-    with patch("src.core.data_management.roboflow_downloader.Roboflow") as mock_rf:
-        # Configurar a estrutura mock completa
-        mock_dataset = MagicMock()
-        
-        mock_version = MagicMock()
-        mock_version.download.return_value = mock_dataset
-        
-        mock_project = MagicMock()
-        mock_project.version.return_value = mock_version
-        
-        mock_workspace = MagicMock()
-        mock_workspace.project.return_value = mock_project
-        
-        mock_rf_instance = MagicMock()
-        mock_rf_instance.workspace.return_value = mock_workspace
-        
-        mock_rf.return_value = mock_rf_instance
-        
-        yield mock_rf
+    """Stub para a biblioteca Roboflow."""
+    stub = _StubRoboflow()
+    with patch("src.core.data_management.roboflow_downloader.Roboflow", stub):
+        yield stub
 
 
 # Configuração de mock para as configurações
@@ -61,26 +84,43 @@ def mock_config():
         yield config
 
 
+# Configuração única dos mocks de pathlib.Path
+@pytest.fixture(autouse=True)
+def path_mocks():
+    """
+    Mocks dos métodos de pathlib.Path usados pelo downloader, aplicados uma única vez por teste.
+    
+    Por padrão os caminhos existem e não há diretórios temporários; cada teste ajusta o
+    comportamento pelo dicionário, por exemplo path_mocks["exists"].return_value = False.
+    
+    O escopo é por teste de propósito: o próprio pytest usa Path.exists e Path.mkdir ao criar
+    o tmp_path, então o patch não pode ficar ativo entre os testes. Mock simples (em vez de
+    MagicMock) basta, já que nenhum método mágico é usado.
+    """
+    with patch.multiple("pathlib.Path", new_callable=Mock,
+                        exists=DEFAULT, glob=DEFAULT, is_dir=DEFAULT, mkdir=DEFAULT) as mocks:
+        mocks["exists"].return_value = True
+        mocks["glob"].return_value = []
+        mocks["is_dir"].return_value = True
+        yield mocks
+
+
 # Configuração de mock para verificação de diretório
 @pytest.fixture
-def mock_directory_permissions():
-    """Mock para verificação de permissões de diretório."""
-    with patch("pathlib.Path.exists") as mock_exists, \
-         patch("pathlib.Path.mkdir") as mock_mkdir, \
-         patch("builtins.open", mock_open()) as mock_file, \
-         patch("pathlib.Path.unlink") as mock_unlink:
-        
-        mock_exists.return_value = True
-        yield mock_exists, mock_mkdir, mock_file, mock_unlink
+def mock_access():
+    """Mock para verificação de permissões de escrita no diretório."""
+    with patch("os.access") as mock_access:
+        mock_access.return_value = True
+        yield mock_access
 
 
 @pytest.fixture
-def downloader(mock_config, mock_directory_permissions):
+def downloader(mock_config, mock_access):
     """Cria uma instância do RoboflowDownloader com mocks."""
     return RoboflowDownloader()
 
 
-def test_init(mock_config, mock_directory_permissions):
+def test_init(mock_config, mock_access):
     """Testa a inicialização do downloader."""
     # Verificar se a inicialização ocorre corretamente
     downloader = RoboflowDownloader()
@@ -90,175 +130,127 @@ def test_init(mock_config, mock_directory_permissions):
     assert downloader.dest_dir.as_posix() == "/tmp/dummy_data_dir"
 
 
-def test_check_directory_permissions_success(mock_config):
+def test_check_directory_permissions_success(mock_config, mock_access):
     """Testa a verificação de permissões quando tudo está correto."""
-    with patch("pathlib.Path.exists") as mock_exists, \
-         patch("pathlib.Path.mkdir") as mock_mkdir, \
-         patch("builtins.open", mock_open()) as mock_file, \
-         patch("pathlib.Path.unlink") as mock_unlink:
-        
-        mock_exists.return_value = True
-        
-        downloader = RoboflowDownloader()
-        # Se não lançar exceção, está funcionando
-        assert downloader is not None
+    downloader = RoboflowDownloader()
+    # Se não lançar exceção, está funcionando
+    assert downloader is not None
 
 
-def test_check_directory_permissions_mkdir_failure(mock_config):
+def test_check_directory_permissions_mkdir_failure(mock_config, path_mocks):
     """Testa a falha na criação do diretório."""
-    with patch("pathlib.Path.exists") as mock_exists, \
-         patch("pathlib.Path.mkdir") as mock_mkdir:
-        
-        mock_exists.return_value = False
-        mock_mkdir.side_effect = PermissionError("Sem permissão para criar diretório")
-        
-        with pytest.raises(PermissionError):
-            RoboflowDownloader()
+    path_mocks["exists"].return_value = False
+    path_mocks["mkdir"].side_effect = PermissionError("Sem permissão para criar diretório")
+    
+    with pytest.raises(PermissionError):
+        RoboflowDownloader()
 
 
-def test_check_directory_permissions_write_failure(mock_config):
+def test_check_directory_permissions_write_failure(mock_config, mock_access):
     """Testa a falha na escrita no diretório."""
-    with patch("pathlib.Path.exists") as mock_exists, \
-         patch("pathlib.Path.mkdir") as mock_mkdir, \
-         patch("builtins.open") as mock_file:
-        
-        mock_exists.return_value = True
-        mock_file.side_effect = PermissionError("Sem permissão para escrever")
-        
-        with pytest.raises(PermissionError):
-            RoboflowDownloader()
+    mock_access.return_value = False  # Sem permissão para escrever
+    
+    with pytest.raises(PermissionError):
+        RoboflowDownloader()
 
 
-def test_download_dataset_success(downloader, mock_roboflow):
+def test_download_dataset_success(downloader, mock_roboflow, path_mocks):
     """Testa o download bem-sucedido."""
     # Configurar mock para verificar se o dataset já existe
-    with patch("pathlib.Path.exists") as mock_exists:
-        mock_exists.return_value = False
-        
-        success, message = downloader.download_dataset()
-        
-        assert success is True
-        assert "sucesso" in message
-        # Verificar se o método foi chamado com os parâmetros corretos
-        mock_roboflow.assert_called_once_with(api_key="dummy_api_key")
+    path_mocks["exists"].return_value = False
+    
+    success, message = downloader.download_dataset()
+    
+    assert success is True
+    assert "sucesso" in message
+    # Verificar se o cliente foi criado com os parâmetros corretos
+    assert mock_roboflow.api_keys == ["dummy_api_key"]
 
 
 def test_download_dataset_already_exists(downloader):
     """Testa o caso onde o dataset já existe."""
-    # Configurar mock para simular que o dataset já existe
-    with patch("pathlib.Path.exists") as mock_exists:
-        mock_exists.return_value = True
-        
-        success, message = downloader.download_dataset(force_download=False)
-        
-        assert success is True
-        assert "já existe" in message
+    # Por padrão path_mocks simula que o dataset já existe
+    success, message = downloader.download_dataset(force_download=False)
+    
+    assert success is True
+    assert "já existe" in message
 
 
 def test_download_dataset_force(downloader, mock_roboflow):
     """Testa o download forçado mesmo quando o dataset já existe."""
-    # Configurar mock para simular que o dataset já existe
-    with patch("pathlib.Path.exists") as mock_exists:
-        mock_exists.return_value = True
-        
-        success, message = downloader.download_dataset(force_download=True)
-        
-        assert success is True
-        assert "sucesso" in message
-        # Verificar se o download foi chamado mesmo com o dataset existente
-        downloader_rf = mock_roboflow.return_value
-        workspace = downloader_rf.workspace.return_value
-        project = workspace.project.return_value
-        version = project.version.return_value
-        assert version.download.called
+    # Por padrão path_mocks simula que o dataset já existe
+    success, message = downloader.download_dataset(force_download=True)
+    
+    assert success is True
+    assert "sucesso" in message
+    # Verificar se o download foi chamado mesmo com o dataset existente
+    assert mock_roboflow.dataset_version.download_calls
 
 
-def test_download_dataset_failure(downloader, mock_roboflow):
+def test_download_dataset_failure(downloader, mock_roboflow, path_mocks):
     """Testa falha no download."""
     # Configurar mock para simular falha no download
-    with patch("pathlib.Path.exists") as mock_exists:
-        mock_exists.return_value = False
-        
-        # Configurar exceção durante o download
-        downloader_rf = mock_roboflow.return_value
-        workspace = downloader_rf.workspace.return_value
-        project = workspace.project.return_value
-        version = project.version.return_value
-        version.download.side_effect = Exception("Erro de API")
-        
-        success, message = downloader.download_dataset()
-        
-        assert success is False
-        assert "Erro" in message
+    path_mocks["exists"].return_value = False
+    
+    # Configurar exceção durante o download
+    mock_roboflow.dataset_version.error = Exception("Erro de API")
+    
+    success, message = downloader.download_dataset()
+    
+    assert success is False
+    assert "Erro" in message
 
 
 def test_validate_dataset_success(downloader):
     """Testa a validação bem-sucedida do dataset."""
-    # Mockear estrutura de diretórios e arquivos
-    with patch("pathlib.Path.exists") as mock_exists, \
-         patch("pathlib.Path.glob") as mock_glob, \
-         patch("builtins.open", mock_open(read_data="names: ['class1', 'class2']")), \
-         patch("yaml.safe_load") as mock_yaml_load:
-        
-        mock_exists.return_value = True
-        mock_glob.return_value = [Path("image1.jpg"), Path("image2.jpg")]
-        mock_yaml_load.return_value = {"names": ["class1", "class2"]}
+    # Mockear contagem de imagens e leitura do data.yaml (os caminhos já existem via path_mocks)
+    with patch("src.core.data_management.roboflow_downloader.count_images", return_value=2), \
+         patch("src.core.data_management.roboflow_downloader.read_yaml_cached",
+               return_value={"names": ["class1", "class2"]}) as mock_read_yaml:
         
         valid, stats = downloader.validate_dataset()
         
         assert valid is True
+        assert stats["train_images"] == 2
         assert "classes" in stats
         assert len(stats["classes"]) == 2
+        mock_read_yaml.assert_called_once()
 
 
-def test_validate_dataset_missing_directory(downloader):
+def test_validate_dataset_missing_directory(downloader, path_mocks):
     """Testa a validação quando o diretório do dataset não existe."""
-    with patch("pathlib.Path.exists") as mock_exists:
-        mock_exists.return_value = False
-        
-        valid, stats = downloader.validate_dataset()
-        
-        assert valid is False
-        assert "error" in stats
-        assert "não encontrado" in stats["error"]
+    path_mocks["exists"].return_value = False
+    
+    valid, stats = downloader.validate_dataset()
+    
+    assert valid is False
+    assert "error" in stats
+    assert "não encontrado" in stats["error"]
 
 
-def test_cleanup_success(downloader):
+def test_cleanup_success(downloader, path_mocks):
     """Testa a limpeza bem-sucedida."""
-    with patch("pathlib.Path.glob") as mock_glob, \
-         patch("pathlib.Path.is_dir") as mock_is_dir, \
-         patch("shutil.rmtree") as mock_rmtree:
-        
-        # Simular dois diretórios temporários
-        tmp_dir1 = Path("/tmp/dummy_data_dir/tmp_123")
-        tmp_dir2 = Path("/tmp/dummy_data_dir/some_tmp_dir")
-        mock_glob.return_value = [tmp_dir1, tmp_dir2]
-        
-        # Configurar para que is_dir retorne True
-        mock_is_dir.return_value = True
-        
+    # Simular dois diretórios temporários (is_dir já retorna True via path_mocks)
+    tmp_dir1 = Path("/tmp/dummy_data_dir/tmp_123")
+    tmp_dir2 = Path("/tmp/dummy_data_dir/some_tmp_dir")
+    path_mocks["glob"].return_value = [tmp_dir1, tmp_dir2]
+    
+    with patch("shutil.rmtree") as mock_rmtree:
         result = downloader.cleanup()
-        
-        assert result is True
-        assert mock_rmtree.call_count == 2
+    
+    assert result is True
+    assert mock_rmtree.call_count == 2
 
 
-def test_cleanup_failure(downloader):
+def test_cleanup_failure(downloader, path_mocks):
     """Testa falha na limpeza."""
-    with patch("pathlib.Path.glob") as mock_glob, \
-         patch("pathlib.Path.is_dir") as mock_is_dir, \
-         patch("shutil.rmtree") as mock_rmtree:
-        
-        # Simular diretório temporário
-        tmp_dir = Path("/tmp/dummy_data_dir/tmp_123")
-        mock_glob.return_value = [tmp_dir]
-        
-        # Configurar para que is_dir retorne True
-        mock_is_dir.return_value = True
-        
-        # Simular erro ao remover
+    # Simular diretório temporário (is_dir já retorna True via path_mocks)
+    tmp_dir = Path("/tmp/dummy_data_dir/tmp_123")
+    path_mocks["glob"].return_value = [tmp_dir]
+    
+    # Simular erro ao remover
+    with patch("shutil.rmtree") as mock_rmtree:
         mock_rmtree.side_effect = PermissionError("Sem permissão para remover")
-        
         result = downloader.cleanup()
-        
-        assert result is False 
\ No newline at end of file
+    
+    assert result is False 
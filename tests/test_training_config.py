@@ -6,83 +6,75 @@ Testes para o módulo de configuração de treinamento.
 """
 
 import os
-import tempfile
 import pytest
 from pathlib import Path
 import yaml
+from unittest.mock import patch
 from pydantic import ValidationError
 from src.core.training.training_config_pydantic import TrainingConfig, YOLOv8Hyperparameters, TrainingPaths
 
 
-def test_training_config_initialization():
+# Conteúdo do arquivo de configuração de exemplo
+SAMPLE_YAML = b"""
+training:
+  model_size: "nano"
+  batch_size: 16
+  epochs: 100
+  img_size: 640
+paths:
+  model_save_dir: "models/test"
+  data_dir: "datasets/test"
+"""
+
+
+@pytest.fixture(scope="module")
+def sample_yaml(tmp_path_factory):
+    """Arquivo de configuração de exemplo, escrito uma única vez por módulo."""
+    path = tmp_path_factory.mktemp("cfg") / "cfg.yml"
+    path.write_bytes(SAMPLE_YAML)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def data_yaml_file(tmp_path_factory):
+    """Arquivo data.yaml existente, apenas lido pelos testes."""
+    path = tmp_path_factory.mktemp("data") / "data.yaml"
+    path.write_bytes(b"# Test data.yaml")
+    return str(path)
+
+
+def test_training_config_initialization(sample_yaml):
     """Testa a inicialização da configuração TrainingConfig com valores válidos."""
-    # Criar um arquivo YAML temporário para teste
-    with tempfile.NamedTemporaryFile(suffix=".yml", delete=False) as temp_file:
-        yaml_content = """
-        training:
-          model_size: "nano"
-          batch_size: 16
-          epochs: 100
-          img_size: 640
-        paths:
-          model_save_dir: "models/test"
-          data_dir: "datasets/test"
-        """
-        temp_file.write(yaml_content.encode("utf-8"))
-        temp_path = temp_file.name
-
-    try:
-        # Carregar a configuração
-        config = TrainingConfig.from_yaml(temp_path)
-
-        # Verificar se os valores foram carregados corretamente
-        assert config.hyperparameters.model_size == "nano"
-        assert config.hyperparameters.batch_size == 16
-        assert config.hyperparameters.epochs == 100
-        assert config.hyperparameters.img_size == 640
-        assert config.paths.model_save_dir == Path("models/test")
-        assert config.paths.data_dir == Path("datasets/test")
-        
-        # Verificar valores padrão opcionais
-        assert config.hyperparameters.optimizer == "SGD"
-        assert config.hyperparameters.lr0 == 0.01
-        assert config.hyperparameters.patience == 50
-    finally:
-        # Limpar o arquivo temporário
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-
-
-def test_hyperparameters_validation():
-    """Testa a validação de parâmetros inválidos."""
-    # Criar um hiperparâmetro com valores inválidos
-    with pytest.raises(ValidationError):
-        # Batch size negativo deve falhar
-        YOLOv8Hyperparameters(
-            model_size="nano",
-            batch_size=-1,
-            epochs=100,
-            img_size=640
-        )
+    # Carregar a configuração
+    config = TrainingConfig.from_yaml(sample_yaml)
+
+    # Verificar se os valores foram carregados corretamente
+    assert config.hyperparameters.model_size == "nano"
+    assert config.hyperparameters.batch_size == 16
+    assert config.hyperparameters.epochs == 100
+    assert config.hyperparameters.img_size == 640
+    assert config.paths.model_save_dir == Path("models/test")
+    assert config.paths.data_dir == Path("datasets/test")
     
-    with pytest.raises(ValidationError):
-        # Epochs negativo deve falhar
-        YOLOv8Hyperparameters(
-            model_size="nano",
-            batch_size=16,
-            epochs=-1,
-            img_size=640
-        )
+    # Verificar valores padrão opcionais
+    assert config.hyperparameters.optimizer == "SGD"
+    assert config.hyperparameters.lr0 == 0.01
+    assert config.hyperparameters.patience == 50
+
 
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"batch_size": -1, "epochs": 100},  # Batch size negativo deve falhar
+        {"batch_size": 16, "epochs": -1},  # Epochs negativo deve falhar
+        {"batch_size": 16, "epochs": 100, "lr0": -0.01},  # Learning rate negativa deve falhar
+    ],
+    ids=["batch_size", "epochs", "lr0"],
+)
+def test_hyperparameters_validation(kwargs):
+    """Testa a validação de parâmetros inválidos."""
     with pytest.raises(ValidationError):
-        # Learning rate negativa deve falhar
-        YOLOv8Hyperparameters(
-            model_size="nano",
-            batch_size=16,
-            epochs=100,
-            img_size=640,
-            lr0=-0.01
-        )
+        YOLOv8Hyperparameters(model_size="nano", img_size=640, **kwargs)
 
 
 def test_get_yolo_model_name():
@@ -112,7 +104,7 @@ def test_get_yolo_model_name():
     assert config.get_yolo_model_name() == "yolov8m.pt"
 
 
-def test_get_training_args():
+def test_get_training_args(data_yaml_file):
     """Testa a geração de argumentos de treinamento."""
     # Criar hiperparâmetros básicos
     hp = YOLOv8Hyperparameters(
@@ -129,31 +121,130 @@ def test_get_training_args():
     
     config = TrainingConfig(hyperparameters=hp, paths=paths)
     
-    # Criar um arquivo data.yaml temporário
-    with tempfile.NamedTemporaryFile(suffix=".yaml", delete=False) as data_file:
-        data_file.write(b"# Test data.yaml")
-        data_yaml_path = data_file.name
-    
-    try:
-        # Configurar data_yaml_path
-        with pytest.raises(FileNotFoundError):
-            # Deve falhar ao tentar definir um caminho que não existe
-            config.set_data_yaml_path("invalid_path.yaml")
-        
-        # Definir com um caminho que existe
-        config.set_data_yaml_path(data_yaml_path)
-        
-        # Obter argumentos de treinamento
-        args = config.get_training_args()
-        
-        # Verificar argumentos
-        assert args["data"] == data_yaml_path
-        assert args["epochs"] == 100
-        assert args["batch"] == 16
-        assert args["imgsz"] == 640
-        assert args["name"] == "yolov8_nano_640px"
-        assert args["project"] == str(Path("models/test"))
-    finally:
-        # Limpar arquivos temporários
-        if os.path.exists(data_yaml_path):
-            os.unlink(data_yaml_path) 
\ No newline at end of file
+    # Configurar data_yaml_path
+    with pytest.raises(FileNotFoundError):
+        # Deve falhar ao tentar definir um caminho que não existe
+        config.set_data_yaml_path("invalid_path.yaml")
+    
+    # Definir com um caminho que existe
+    config.set_data_yaml_path(data_yaml_file)
+    
+    # Obter argumentos de treinamento
+    args = config.get_training_args()
+    
+    # Verificar argumentos
+    assert args["data"] == data_yaml_file
+    assert args["epochs"] == 100
+    assert args["batch"] == 16
+    assert args["imgsz"] == 640
+    assert args["name"] == "yolov8_nano_640px"
+    assert args["project"] == str(Path("models/test"))
+
+
+def test_from_yaml_reuses_validated_values(tmp_path):
+    """Testa se leituras repetidas do mesmo YAML reaproveitam os valores validados."""
+    temp_path = tmp_path / "config.yml"
+    temp_path.write_bytes(b"training:\n  model_size: small\n  img_size: 320\npaths:\n  model_save_dir: models/test\n")
+    temp_path = str(temp_path)
+    
+    first = TrainingConfig.from_yaml(temp_path)
+    
+    # Segunda leitura não deve validar novamente
+    with patch.object(TrainingConfig, "_validate_yaml") as mock_validate:
+        second = TrainingConfig.from_yaml(temp_path)
+        mock_validate.assert_not_called()
+    
+    assert second.hyperparameters.model_size == "small"
+    assert second.hyperparameters.img_size == 320
+    assert second.paths.model_save_dir == Path("models/test")
+    assert second.get_training_args() == first.get_training_args()
+    
+    # Um arquivo alterado é validado novamente
+    with open(temp_path, "w") as f:
+        f.write("training:\n  img_size: 100\n")
+    
+    with pytest.raises(ValidationError):
+        TrainingConfig.from_yaml(temp_path)
+
+
+def test_training_args_reflect_config_changes(data_yaml_file):
+    """Testa se os argumentos de treinamento refletem alterações nos modelos aninhados."""
+    hp = YOLOv8Hyperparameters(model_size="nano", batch_size=16, epochs=5, img_size=640)
+    paths = TrainingPaths(model_save_dir=Path("models/test"), data_dir=Path("datasets/test"))
+    config = TrainingConfig(hyperparameters=hp, paths=paths)
+    
+    args = config.get_training_args()
+    assert args["epochs"] == 5
+    assert args["data"] is None
+    
+    # Alterar os argumentos devolvidos não afeta a configuração
+    args["epochs"] = 1
+    assert config.get_training_args()["epochs"] == 5
+    
+    # Campos de hyperparameters e paths alterados diretamente
+    config.hyperparameters.epochs = 3
+    config.paths.model_save_dir = Path("models/outro")
+    args = config.get_training_args()
+    assert args["epochs"] == 3
+    assert args["project"] == str(Path("models/outro"))
+    
+    config.set_data_yaml_path(data_yaml_file)
+    assert config.get_training_args()["data"] == data_yaml_file
+
+
+def test_from_yaml_reflects_environment(tmp_path, monkeypatch):
+    """Testa se o cache de valores validados respeita as variáveis de ambiente atuais."""
+    config_path = tmp_path / "config.yml"
+    config_path.write_bytes(b"training:\n  epochs: ${FROM_YAML_EPOCHS:5}\npaths:\n  model_save_dir: models/test\n")
+    monkeypatch.delenv("FROM_YAML_EPOCHS", raising=False)
+    
+    assert TrainingConfig.from_yaml(str(config_path)).hyperparameters.epochs == 5
+    
+    monkeypatch.setenv("FROM_YAML_EPOCHS", "77")
+    assert TrainingConfig.from_yaml(str(config_path)).hyperparameters.epochs == 77
+
+
+def test_from_yaml_cache_hit_recreates_directories(tmp_path):
+    """Testa se uma leitura em cache recria diretórios removidos desde a validação."""
+    model_dir = tmp_path / "models"
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(f"paths:\n  model_save_dir: {model_dir}\n")
+    
+    TrainingConfig.from_yaml(str(config_path))
+    model_dir.rmdir()
+    
+    TrainingConfig.from_yaml(str(config_path))
+    assert model_dir.is_dir()
+
+
+def test_from_yaml_cache_is_bounded(tmp_path, monkeypatch):
+    """Testa se o cache de valores validados descarta os arquivos usados há mais tempo."""
+    from src.core.training import training_config_pydantic
+    
+    monkeypatch.setattr(training_config_pydantic, "_VALIDATED_CONFIG_CACHE", {})
+    monkeypatch.setattr(training_config_pydantic, "_VALIDATED_CONFIG_CACHE_SIZE", 2)
+    
+    paths = []
+    for name in ("a", "b", "c"):
+        config_path = tmp_path / f"{name}.yml"
+        config_path.write_text(f"paths:\n  model_save_dir: {tmp_path / name}\n")
+        paths.append(str(config_path))
+    
+    TrainingConfig.from_yaml(paths[0])
+    TrainingConfig.from_yaml(paths[1])
+    TrainingConfig.from_yaml(paths[0])
+    TrainingConfig.from_yaml(paths[2])
+    
+    cached = {key[0] for key in training_config_pydantic._VALIDATED_CONFIG_CACHE}
+    assert cached == {os.path.abspath(paths[0]), os.path.abspath(paths[2])}
+
+
+def test_paths_recreate_removed_directory(tmp_path):
+    """Testa se um diretório removido é criado novamente na validação seguinte."""
+    model_dir = tmp_path / "models"
+    TrainingPaths(model_save_dir=model_dir, data_dir=tmp_path / "data")
+    assert model_dir.is_dir()
+    
+    model_dir.rmdir()
+    TrainingPaths(model_save_dir=model_dir, data_dir=tmp_path / "data")
+    assert model_dir.is_dir()
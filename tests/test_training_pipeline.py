@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Testes para o pipeline de treinamento.
+"""
+
+import logging
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from src.core.training.training_pipeline import TrainingPipeline
+
+
+class _StructuralTrainer:
+    """Treinador que segue ITrainer apenas estruturalmente, sem warm_up."""
+
+    def train(self, data_yaml_path=None, resume=False):
+        return {"success": True}
+
+    def validate(self):
+        return {"success": True}
+
+    def export_model(self, format="onnx"):
+        return {"success": True}
+
+
+class _RecordingTrainer(_StructuralTrainer):
+    """Treinador que registra a ordem das etapas e a thread de cada uma."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def warm_up(self):
+        self.events.append(("warm_up", threading.current_thread().name))
+
+    def train(self, data_yaml_path=None, resume=False):
+        self.events.append(("train", threading.current_thread().name))
+        return super().train(data_yaml_path, resume)
+
+
+@pytest.fixture
+def downloader():
+    """Downloader com download e validação bem-sucedidos."""
+    downloader = Mock()
+    downloader.download_dataset.return_value = (True, "ok")
+    downloader.validate_dataset.return_value = (True, {"train_images": 1})
+    return downloader
+
+
+def test_warm_up_skipped_for_trainer_without_warm_up(downloader, caplog):
+    """Testa se o pipeline ignora treinadores estruturais que não oferecem warm_up."""
+    pipeline = TrainingPipeline(Mock(), downloader, _StructuralTrainer())
+
+    with caplog.at_level(logging.WARNING):
+        results = pipeline.run_full_pipeline()
+
+    assert results["deployment"] == {"success": True}
+    assert "aquecer" not in caplog.text
+
+
+def test_run_full_pipeline_warms_up_while_downloading(downloader):
+    """Testa se o aquecimento roda na thread principal durante o download."""
+    events = []
+    warmed_up = threading.Event()
+    trainer = _RecordingTrainer(events)
+    original_warm_up = trainer.warm_up
+
+    def warm_up():
+        original_warm_up()
+        warmed_up.set()
+
+    def download_dataset(force_download=False):
+        # O download só termina depois do aquecimento, provando que as etapas se sobrepõem
+        assert warmed_up.wait(timeout=5)
+        events.append(("download", threading.current_thread().name))
+        return True, "ok"
+
+    def validate_dataset():
+        events.append(("validate", threading.current_thread().name))
+        return True, {"train_images": 1}
+
+    trainer.warm_up = warm_up
+    downloader.download_dataset.side_effect = download_dataset
+    downloader.validate_dataset.side_effect = validate_dataset
+    pipeline = TrainingPipeline(Mock(), downloader, trainer)
+
+    results = pipeline.run_full_pipeline()
+
+    main_thread = threading.main_thread().name
+    assert [name for name, _ in events] == ["warm_up", "download", "validate", "train"]
+    assert events[0][1] == events[3][1] == main_thread
+    assert events[1][1] == events[2][1] != main_thread
+    assert results["download"] is True and results["preparation"] is True
+
+
+def test_run_full_pipeline_stops_on_failed_download(downloader):
+    """Testa se um download mal-sucedido interrompe o pipeline antes da validação."""
+    events = []
+    downloader.download_dataset.return_value = (False, "sem rede")
+    pipeline = TrainingPipeline(Mock(), downloader, _RecordingTrainer(events))
+
+    results = pipeline.run_full_pipeline()
+
+    assert results["download"] is False and results["preparation"] is False
+    downloader.validate_dataset.assert_not_called()
+    assert [name for name, _ in events] == ["warm_up"]
+
+
+def test_run_full_pipeline_propagates_download_error(downloader, monkeypatch):
+    """Testa se um erro inesperado na thread de download chega à thread principal."""
+    def failing_download(self, force=False):
+        raise RuntimeError("falha no download")
+
+    monkeypatch.setattr(TrainingPipeline, "download_data", failing_download)
+    events = []
+    pipeline = TrainingPipeline(Mock(), downloader, _RecordingTrainer(events))
+
+    with pytest.raises(RuntimeError, match="falha no download"):
+        pipeline.run_full_pipeline()
+
+    downloader.validate_dataset.assert_not_called()
+    assert [name for name, _ in events] == ["warm_up"]
@@ -7,27 +7,55 @@ Testes para o módulo de treinamento YOLOv8.
 
 import os
 import sys
-import tempfile
-import shutil
 import pytest
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 from src.core.training.training_config_pydantic import TrainingConfig, YOLOv8Hyperparameters, TrainingPaths
+from src.core.training import yolov8_trainer
 from src.core.training.yolov8_trainer import YOLOv8Trainer
 
 
+# Conteúdo do data.yaml de teste
+DATA_YAML = b"""
+path: ./data
+train: images/train
+val: images/val
+test: images/test
+
+names:
+  0: class1
+  1: class2
+"""
+
+
+# Tamanho do arquivo gerado pela exportação simulada
+EXPORTED_MODEL_SIZE = 10 << 20  # 10 MB
+
+
 # Mock para a classe YOLO
 class MockYOLO:
+    # Melhor modelo informado pelo treino; os testes apontam para um arquivo em tmp_path
+    best = "mock_best_model.pt"
+    
+    # Argumentos recebidos pela última chamada de train()
+    train_args = {}
+    
     def __init__(self, model_path):
         self.model_path = model_path
-        self.best = "mock_best_model.pt"
         self.save_dir = "mock_results_dir"
+        self.callbacks = {}
+    
+    def add_callback(self, event, func):
+        # Registrar callbacks como no ultralytics
+        self.callbacks.setdefault(event, []).append(func)
     
     def train(self, **kwargs):
-        # Simular um objeto de resultados de treinamento
+        # Registrar os argumentos recebidos e simular um objeto de resultados de treinamento
+        MockYOLO.train_args = kwargs
         results = MagicMock()
-        results.best = "mock_best_model.pt"
+        results.best = self.best
         results.save_dir = "mock_results_dir"
         results.results_dict = {
             "metrics/precision(B)": 0.85,
@@ -50,26 +78,30 @@ class MockYOLO:
         }
         return results
     
-    def export(self, **kwargs):
-        # Simular exportação do modelo
-        return "mock_exported_model.onnx"
+    def export(self, format="onnx", **kwargs):
+        # Simular exportação do modelo: arquivo esparso de 10 MB ao lado do modelo carregado
+        exported_path = Path(self.model_path).with_suffix(f".{format}")
+        with open(exported_path, "wb") as f:
+            f.truncate(EXPORTED_MODEL_SIZE)
+        return str(exported_path)
 
 
-@pytest.fixture
-def mock_ultralytics(monkeypatch):
-    """Mock do pacote ultralytics."""
+@pytest.fixture(scope="module")
+def mock_ultralytics():
+    """Mock do pacote ultralytics, aplicado uma única vez por módulo."""
     mock_pkg = MagicMock()
     mock_pkg.YOLO = MockYOLO
-    monkeypatch.setattr("src.core.training.yolov8_trainer.YOLO", MockYOLO)
-    monkeypatch.setattr("src.core.training.yolov8_trainer.ULTRALYTICS_AVAILABLE", True)
-    return mock_pkg
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("src.core.training.yolov8_trainer.YOLO", MockYOLO)
+        mp.setattr("src.core.training.yolov8_trainer.ULTRALYTICS_AVAILABLE", True)
+        yield mock_pkg
 
 
-@pytest.fixture
-def training_config():
-    """Configuração de teste para treinamento."""
+@pytest.fixture(scope="module")
+def training_config(tmp_path_factory):
+    """Configuração de teste para treinamento, compartilhada pelos testes do módulo."""
     # Usar um diretório temporário
-    temp_dir = tempfile.mkdtemp()
+    temp_dir = tmp_path_factory.mktemp("training")
     
     # Criar hiperparâmetros de teste
     hyperparameters = YOLOv8Hyperparameters(
@@ -81,8 +113,8 @@ def training_config():
     
     # Criar configuração de caminhos
     paths = TrainingPaths(
-        model_save_dir=Path(temp_dir) / "models",
-        data_dir=Path(temp_dir) / "data"
+        model_save_dir=temp_dir / "models",
+        data_dir=temp_dir / "data"
     )
     
     # Criar arquivo data.yaml de teste
@@ -90,31 +122,33 @@ def training_config():
     data_dir.mkdir(parents=True, exist_ok=True)
     data_yaml_path = data_dir / "data.yaml"
     
-    with open(data_yaml_path, "w") as f:
-        f.write("""
-        path: ./data
-        train: images/train
-        val: images/val
-        test: images/test
-        
-        names:
-          0: class1
-          1: class2
-        """)
+    data_yaml_path.write_bytes(DATA_YAML)
     
     # Configurar data_yaml_path
     paths.data_yaml_path = data_yaml_path
     
-    # Criar configuração completa
-    config = TrainingConfig(
+    # Criar configuração completa; as seções acima já foram validadas, então
+    # model_construct apenas as reúne sem repetir a validação
+    return TrainingConfig.model_construct(
         hyperparameters=hyperparameters,
         paths=paths
     )
-    
-    yield config
-    
-    # Cleanup
-    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture(scope="module")
+def shared_trainer(training_config, mock_ultralytics):
+    """Treinador criado uma única vez por módulo."""
+    return YOLOv8Trainer(training_config)
+
+
+@pytest.fixture
+def trainer(shared_trainer):
+    """Treinador compartilhado, com o estado de modelo limpo antes de cada teste."""
+    shared_trainer.model = None
+    shared_trainer._model_source = None
+    shared_trainer.model_path = None
+    shared_trainer.results_dir = None
+    return shared_trainer
 
 
 def test_trainer_initialization(training_config, mock_ultralytics):
@@ -125,80 +159,206 @@ def test_trainer_initialization(training_config, mock_ultralytics):
     assert trainer.model_path is None
 
 
-def test_trainer_train(training_config, mock_ultralytics):
+def test_trainer_train(trainer, monkeypatch, tmp_path):
     """Testa o método de treinamento."""
-    trainer = YOLOv8Trainer(training_config)
+    # O treino só registra o melhor modelo se o arquivo existir
+    best_path = tmp_path / "mock_best_model.pt"
+    best_path.touch()
+    monkeypatch.setattr(MockYOLO, "best", str(best_path))
     
     # Treinar o modelo
     results = trainer.train()
     
     # Verificar resultados
-    assert results["success"] is True
-    assert results["model_path"] == "mock_best_model.pt"
-    assert results["precision"] == 0.85
-    assert results["mAP50"] == 0.90
-    assert trainer.model_path == Path("mock_best_model.pt")
+    summary = {key: results.get(key) for key in ("success", "model_path", "precision", "mAP50")}
+    assert summary == {"success": True, "model_path": str(best_path), "precision": 0.85, "mAP50": 0.90}
+    assert trainer.model_path == best_path
+
+
+@pytest.mark.parametrize(
+    "cudnn_benchmark, device, num_gpus, deterministic_off",
+    [
+        (False, "", 1, False),  # Padrão: modo determinístico do ultralytics mantido
+        (True, "", 0, False),  # Sem CUDA: nada muda
+        (True, "cpu", 1, False),  # CPU explícita, mesmo com GPU visível
+        (True, "", 1, True),  # Benchmark pedido e treino em GPU
+        (True, "0", 2, True),
+    ],
+)
+def test_trainer_deterministic_only_for_cuda_benchmark(trainer, monkeypatch, cudnn_benchmark,
+                                                        device, num_gpus, deterministic_off):
+    """Testa se deterministic=False só é enviado com cudnn_benchmark e treino em CUDA."""
+    hp = trainer.config.hyperparameters
+    monkeypatch.setattr(hp, "cudnn_benchmark", cudnn_benchmark)
+    monkeypatch.setattr(hp, "device", device)
+    monkeypatch.setattr(yolov8_trainer, "_cuda_device_count", lambda: num_gpus)
+    monkeypatch.setattr(yolov8_trainer, "_configure_torch_backends", lambda cudnn_benchmark: None)
+    
+    trainer.train()
+    
+    if deterministic_off:
+        assert MockYOLO.train_args["deterministic"] is False
+    else:
+        assert "deterministic" not in MockYOLO.train_args
 
 
-def test_trainer_validate(training_config, mock_ultralytics):
+def test_trainer_validate(trainer, tmp_path):
     """Testa o método de validação."""
-    trainer = YOLOv8Trainer(training_config)
+    # Criar o arquivo falso para que Path.exists() retorne True
+    model_path = tmp_path / "mock_best_model.pt"
+    model_path.touch()
     
     # Definir model_path manualmente para simular modelo treinado
-    trainer.model_path = Path("mock_best_model.pt")
+    trainer.model_path = model_path
     
-    # Criar o arquivo falso para que Path.exists() retorne True
-    Path("mock_best_model.pt").touch()
-    
-    try:
-        # Validar o modelo
-        metrics = trainer.validate()
-        
-        # Verificar resultados
-        assert metrics["precision"] == 0.84
-        assert metrics["recall"] == 0.81
-        assert metrics["mAP50"] == 0.89
-        assert metrics["mAP50-95"] == 0.74
-    finally:
-        # Limpar o arquivo criado
-        if Path("mock_best_model.pt").exists():
-            Path("mock_best_model.pt").unlink()
-
-
-def test_trainer_export_model(training_config, mock_ultralytics, monkeypatch):
+    # Validar o modelo
+    metrics = trainer.validate()
+    
+    # Verificar resultados
+    expected = {"precision": 0.84, "recall": 0.81, "mAP50": 0.89, "mAP50-95": 0.74}
+    assert {key: metrics.get(key) for key in expected} == expected
+
+
+def test_trainer_export_model(trainer, tmp_path):
     """Testa o método de exportação do modelo."""
-    # Mock para Path.stat() para o cálculo do tamanho do modelo
-    class MockPathStat:
-        @property
-        def st_size(self):
-            return 1024 * 1024 * 10  # 10 MB
+    # Criar o arquivo falso para que Path.exists() retorne True
+    model_path = tmp_path / "mock_best_model.pt"
+    model_path.touch()
     
-    mock_path = MagicMock()
-    mock_path.stat.return_value = MockPathStat()
-    mock_path.parent = Path("mock_dir")
-    mock_path.name = "mock_exported_model.onnx"
+    # Definir model_path manualmente para simular modelo treinado
+    trainer.model_path = model_path
     
-    # Mock para Path(str(exported))
-    monkeypatch.setattr("pathlib.Path", lambda x: mock_path if x == "mock_exported_model.onnx" else Path(x))
+    # Exportar o modelo
+    result = trainer.export_model(format="onnx")
     
-    # Criar treinador
-    trainer = YOLOv8Trainer(training_config)
+    # Verificar resultados
+    assert result["success"] is True
+    assert result["format"] == "onnx"
+    assert result["model_size_mb"] == 10
+    assert result["exported_path"] == str(tmp_path / "mock_best_model.onnx") 
+
+
+@pytest.fixture
+def train_images(trainer, monkeypatch, tmp_path):
+    """data.yaml em tmp_path com 4 imagens (e um arquivo que não é imagem) no treino."""
+    images_dir = tmp_path / "data" / "images" / "train"
+    images_dir.mkdir(parents=True)
+    for name in ("a.jpg", "b.jpg", "c.png", "d.jpeg", "notes.txt"):
+        (images_dir / name).touch()
     
-    # Definir model_path manualmente para simular modelo treinado
-    trainer.model_path = Path("mock_best_model.pt")
+    data_yaml_path = tmp_path / "data.yaml"
+    data_yaml_path.write_bytes(DATA_YAML)
+    monkeypatch.setattr(trainer.config.paths, "data_yaml_path", data_yaml_path)
+    return images_dir
+
+
+def _patch_available_memory(monkeypatch, available):
+    """Simula o psutil com a memória disponível informada."""
+    memory = SimpleNamespace(available=available)
+    monkeypatch.setattr(yolov8_trainer, "psutil", SimpleNamespace(virtual_memory=lambda: memory), raising=False)
+    monkeypatch.setattr(yolov8_trainer, "PSUTIL_AVAILABLE", True)
+
+
+# 4 imagens de 640x640x3 bytes com 50% de margem
+CACHE_REQUIRED_BYTES = 4 * 640 * 640 * 3 * 1.5
+
+
+@pytest.mark.parametrize(
+    "available, expected",
+    [
+        (int(CACHE_REQUIRED_BYTES) + 1, "ram"),
+        (int(CACHE_REQUIRED_BYTES), "disk"),  # Sem folga, a RAM não é usada
+        (0, "disk"),
+    ],
+)
+def test_select_cache_mode(trainer, train_images, monkeypatch, available, expected):
+    """Testa a escolha entre cache em RAM e em disco pela memória disponível."""
+    _patch_available_memory(monkeypatch, available)
     
-    # Criar o arquivo falso para que Path.exists() retorne True
-    Path("mock_best_model.pt").touch()
-    
-    try:
-        # Exportar o modelo
-        result = trainer.export_model(format="onnx")
-        
-        # Verificar resultados
-        assert result["success"] is True
-        assert result["format"] == "onnx"
-        assert result["model_size_mb"] == 10
-    finally:
-        # Limpar o arquivo criado
-        if Path("mock_best_model.pt").exists():
-            Path("mock_best_model.pt").unlink() 
\ No newline at end of file
+    assert trainer._select_cache_mode() == expected
+
+
+def test_select_cache_mode_without_train_dir(trainer, train_images, monkeypatch):
+    """Testa se o cache fica a cargo do ultralytics quando o treino não é encontrado."""
+    _patch_available_memory(monkeypatch, 1 << 40)
+    train_images.rename(train_images.with_name("missing"))
+    
+    assert trainer._select_cache_mode() is None
+
+
+def test_select_cache_mode_without_psutil(trainer, train_images, monkeypatch):
+    """Testa se, sem psutil, nenhum modo de cache é escolhido."""
+    monkeypatch.setattr(yolov8_trainer, "PSUTIL_AVAILABLE", False)
+    
+    assert trainer._select_cache_mode() is None
+
+
+def test_trainer_train_sets_selected_cache(trainer, train_images, monkeypatch):
+    """Testa se o modo de cache escolhido é enviado ao treino."""
+    _patch_available_memory(monkeypatch, 0)
+    
+    trainer.train()
+    
+    assert MockYOLO.train_args["cache"] == "disk"
+
+
+@pytest.mark.parametrize(
+    "num_gpus, cpu_count, workers, expected",
+    [
+        (0, 8, 8, {"device": "cpu"}),
+        (1, 8, 8, {"device": "0"}),
+        (2, 32, 8, {"device": "0,1", "workers": 8}),  # Limitado aos workers configurados
+        (2, 8, 8, {"device": "0,1", "workers": 4}),  # CPUs divididas entre as GPUs
+        (4, 4, 8, {"device": "0,1,2,3", "workers": 2}),  # Mínimo de 2 por processo
+        (2, None, 8, {"device": "0,1", "workers": 2}),
+    ],
+)
+def test_auto_device_args(trainer, monkeypatch, num_gpus, cpu_count, workers, expected):
+    """Testa a escolha de CPU, GPU única ou DDP e a divisão dos workers entre as GPUs."""
+    monkeypatch.setattr(yolov8_trainer, "_cuda_device_count", lambda: num_gpus)
+    monkeypatch.setattr(yolov8_trainer.os, "cpu_count", lambda: cpu_count)
+    
+    assert trainer._auto_device_args(workers) == expected
+
+
+@pytest.mark.parametrize("option", ["cuda_prefetch", "compile"])
+def test_auto_device_args_warns_about_ddp_options(trainer, monkeypatch, caplog, option):
+    """Testa o aviso de que cuda_prefetch e compile não se aplicam ao DDP."""
+    monkeypatch.setattr(yolov8_trainer, "_cuda_device_count", lambda: 2)
+    monkeypatch.setattr(trainer.config.hyperparameters, option, True)
+    
+    trainer._auto_device_args(8)
+    
+    assert "DDP" in caplog.text
+
+
+def test_trainer_train_uses_auto_device(trainer, monkeypatch):
+    """Testa se device="auto" envia a lista de GPUs e os workers por GPU ao treino."""
+    monkeypatch.setattr(trainer.config.hyperparameters, "device", "auto")
+    monkeypatch.setattr(trainer.config.hyperparameters, "workers", 8)
+    monkeypatch.setattr(yolov8_trainer, "_cuda_device_count", lambda: 2)
+    monkeypatch.setattr(yolov8_trainer, "_configure_torch_backends", lambda cudnn_benchmark: None)
+    monkeypatch.setattr(yolov8_trainer.os, "cpu_count", lambda: 8)
+    
+    trainer.train()
+    
+    assert (MockYOLO.train_args["device"], MockYOLO.train_args["workers"]) == ("0,1", 4)
+
+
+def test_trainer_export_model_to_output_dir(trainer, tmp_path):
+    """Testa se o modelo exportado é movido para output_dir, substituindo exportações antigas."""
+    model_path = tmp_path / "mock_best_model.pt"
+    model_path.touch()
+    trainer.model_path = model_path
+    
+    output_dir = tmp_path / "exports"
+    output_dir.mkdir()
+    (output_dir / "mock_best_model.onnx").write_bytes(b"old")
+    
+    result = trainer.export_model(format="onnx", output_dir=output_dir)
+    
+    target_path = output_dir / "mock_best_model.onnx"
+    assert result["exported_path"] == str(target_path)
+    assert target_path.stat().st_size == EXPORTED_MODEL_SIZE
+    assert result["model_size_mb"] == 10
+    assert not (tmp_path / "mock_best_model.onnx").exists()